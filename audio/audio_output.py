@@ -0,0 +1,185 @@
+import sounddevice as sd
+import numpy as np
+import threading
+import collections
+import wave
+import sys
+
+
+def load_wav(path, samplerate):
+    """Reads a PCM WAV file into mono float32 at `samplerate` (linear resampling)."""
+    with wave.open(path, 'rb') as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+    pcm = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+    if width == 1:
+        pcm = (pcm - 128.0) / 128.0
+    else:
+        pcm /= float(np.iinfo(dtype).max)
+    pcm = pcm.reshape(-1, channels).mean(axis=1)
+
+    if rate != samplerate:
+        n_out = int(round(len(pcm) * samplerate / rate))
+        pcm = np.interp(np.linspace(0, len(pcm) - 1, n_out), np.arange(len(pcm)), pcm).astype(np.float32)
+    return pcm.astype(np.float32)
+
+
+class SpeechChannel:
+    """
+    Streamed TTS voice inside AudioOutput. Producers write raw little-endian int16
+    PCM bytes in any chunk size; the mixer callback drains it.
+    """
+
+    def __init__(self):
+        self._blocks = collections.deque()
+        self._head = None
+        self._offset = 0
+        self._carry = b""
+        self._flush = False
+        self._idle = threading.Event()
+        self._idle.set()
+        # Queueing a block and clearing _idle must be atomic against the callback's "drained" check,
+        # or wait() can return while audio is still queued
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        data = self._carry + data
+        usable = len(data) - (len(data) % 2)
+        self._carry = data[usable:]
+        if usable:
+            self._queue(np.frombuffer(data[:usable], dtype='<i2').astype(np.float32) / 32768.0)
+
+    def write_pcm(self, pcm):
+        """Queues float32 samples directly."""
+        self._queue(np.asarray(pcm, dtype=np.float32))
+
+    def _queue(self, block):
+        with self._lock:
+            self._blocks.append(block)
+            self._idle.clear()
+
+    def clear(self):
+        """Drops everything queued, including the block currently playing."""
+        with self._lock:
+            self._blocks.clear()
+            self._carry = b""
+            self._flush = True  # The callback owns _head, so it drops it on its next block
+            self._idle.set()
+
+    def wait(self, timeout=None):
+        """Blocks until everything written so far has been played."""
+        return self._idle.wait(timeout)
+
+    @property
+    def active(self):
+        return not self._idle.is_set()
+
+    def _mix_into(self, out):
+        """Called from the audio callback. Adds up to len(out) samples, returns how many."""
+        if self._flush:
+            self._flush = False
+            self._head = None
+
+        filled = 0
+        while filled < len(out):
+            if self._head is None:
+                # clear() may empty the queue from another thread; an exception here would kill the stream
+                with self._lock:
+                    if not self._blocks:
+                        break
+                    self._head = self._blocks.popleft()
+                self._offset = 0
+            n = min(len(out) - filled, len(self._head) - self._offset)
+            out[filled:filled + n] += self._head[self._offset:self._offset + n]
+            filled += n
+            self._offset += n
+            if self._offset >= len(self._head):
+                self._head = None
+
+        with self._lock:
+            if self._head is None and not self._blocks:
+                self._idle.set()
+        return filled
+
+
+class AudioOutput:
+    """
+    Nova's single output stream. TTS speech, preloaded earcons and the amplifier
+    keep-alive tone are mixed in one PortAudio callback. The keep-alive is only
+    mixed in while nothing else is playing.
+    """
+
+    def __init__(self, samplerate=22050, blocksize=512, keep_alive_hz=10, keep_alive_level=0.01):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.speech = SpeechChannel()
+        self.keep_alive = False
+        self.keep_alive_hz = keep_alive_hz
+        self.keep_alive_level = keep_alive_level
+
+        self._earcons = {}
+        self._playing = []  # [samples, offset] pairs; only touched under _lock
+        self._lock = threading.Lock()
+        self._phase = 0
+        self._stream = None
+
+    def start(self):
+        if self._stream is not None:
+            return
+        self._stream = sd.OutputStream(
+            samplerate=self.samplerate,
+            channels=1,
+            dtype='float32',
+            blocksize=self.blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+        print("<<Audio Output Started>>")
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def load_earcon(self, name, path):
+        self._earcons[name] = load_wav(path, self.samplerate)
+
+    def play_earcon(self, name):
+        """Starts a preloaded earcon on the next audio block and returns its length in seconds."""
+        samples = self._earcons[name]
+        with self._lock:
+            self._playing.append([samples, 0])
+        return len(samples) / self.samplerate
+
+    @property
+    def busy(self):
+        return self.speech.active or bool(self._playing)
+
+    def _callback(self, outdata, frames, time, status):
+        if status:
+            print(status, file=sys.stderr)
+
+        out = np.zeros(frames, dtype=np.float32)
+        silent = self.speech._mix_into(out) == 0
+
+        with self._lock:
+            silent = silent and not self._playing
+            for sound in self._playing:
+                samples, offset = sound
+                n = min(frames, len(samples) - offset)
+                out[:n] += samples[offset:offset + n]
+                sound[1] = offset + n
+            self._playing = [s for s in self._playing if s[1] < len(s[0])]
+
+        if self.keep_alive and silent:
+            t = (self._phase + np.arange(frames)) / self.samplerate
+            out += self.keep_alive_level * np.sin(2 * np.pi * self.keep_alive_hz * t)
+        self._phase = (self._phase + frames) % self.samplerate
+
+        np.clip(out, -1.0, 1.0, out=out)
+        outdata[:, 0] = out
@@ -0,0 +1,40 @@
+import threading
+
+
+class BargeInMonitor:
+    """
+    Listens for the wake word while Nova is speaking. When it fires, `interrupted`
+    is set so the main loop can abort the Gemini stream and flush TTS, and the
+    wake listener's detected_at marks where the student's new turn starts.
+
+    Only the wake word can interrupt: without echo cancellation a plain VAD would
+    trigger on Nova's own voice coming back through the microphone.
+    """
+
+    def __init__(self, wake_engine, on_interrupt=None):
+        self.wake_engine = wake_engine
+        self.on_interrupt = on_interrupt  # Called from the watcher thread, e.g. to wake an event loop
+        self.interrupted = threading.Event()
+        self._disarm = threading.Event()
+        self._thread = None
+
+    def arm(self):
+        self.interrupted.clear()
+        self._disarm.clear()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def disarm(self):
+        """Stops listening. Returns True if the student interrupted."""
+        self._disarm.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return self.interrupted.is_set()
+
+    def _watch(self):
+        if self.wake_engine.listen(cancel=self._disarm):
+            print("<<Barge-In: Student Interrupted>>")
+            self.interrupted.set()
+            if self.on_interrupt:
+                self.on_interrupt()
@@ -0,0 +1,147 @@
+import sounddevice as sd
+import numpy as np
+import threading
+import sys
+
+
+class CaptureBus:
+    """
+    One always-open microphone stream shared by every audio consumer.
+
+    The input callback is the only writer: it copies each block into a preallocated
+    int16 ring and then advances `total`. Consumers never lock the ring — each keeps
+    its own read cursor (an absolute sample index) and copies out what it needs,
+    converted to its own sample format.
+    """
+
+    def __init__(self, samplerate=16000, channels=1, blocksize=512, capacity_seconds=30):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.capacity = int(samplerate * capacity_seconds)
+        self._ring = np.zeros(self.capacity, dtype=np.int16)
+        self.total = 0  # Samples ever written; only the callback advances it
+
+        self._consumers = []
+        self._stream = None
+
+    def start(self):
+        if self._stream is not None:
+            return
+        self._stream = sd.InputStream(
+            samplerate=self.samplerate,
+            channels=self.channels,
+            dtype='int16',
+            blocksize=self.blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+        print("<<Capture Bus Started>>")
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        for consumer in list(self._consumers):
+            consumer._wake.set()
+
+    def subscribe(self, name, dtype='float32'):
+        """Registers a consumer whose cursor starts at the live edge."""
+        consumer = CaptureConsumer(self, name, dtype)
+        self._consumers.append(consumer)
+        return consumer
+
+    def unsubscribe(self, consumer):
+        if consumer in self._consumers:
+            self._consumers.remove(consumer)
+
+    def oldest(self):
+        return max(0, self.total - self.capacity)
+
+    def peek(self, n):
+        """Copies the newest n samples as int16 without touching any cursor."""
+        end = self.total
+        return self._copy(max(self.oldest(), end - n), end)
+
+    def level(self, window=0.1):
+        """Current input level in dBFS over the last `window` seconds, for metering."""
+        pcm = self.peek(int(self.samplerate * window)).astype(np.float32) / 32768.0
+        if len(pcm) == 0:
+            return -100.0
+        return float(10.0 * np.log10(np.mean(pcm * pcm) + 1e-10))
+
+    def _copy(self, start, end):
+        a = start % self.capacity
+        b = end % self.capacity
+        if end - start <= 0:
+            return np.zeros(0, dtype=np.int16)
+        if a < b:
+            return self._ring[a:b].copy()
+        return np.concatenate((self._ring[a:], self._ring[:b]))
+
+    def _callback(self, indata, frames, time, status):
+        """Runs on the PortAudio thread for every block."""
+        if status:
+            print(status, file=sys.stderr)
+
+        block = indata[:, 0] if indata.ndim > 1 else indata
+        n = len(block)
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self._ring[start:start + first] = block[:first]
+        self._ring[:n - first] = block[first:]
+
+        # Publish only after the samples are in place
+        self.total += n
+
+        for consumer in self._consumers:
+            consumer._wake.set()
+
+
+class CaptureConsumer:
+    """A read cursor into a CaptureBus. Each consumer must be read from a single thread."""
+
+    def __init__(self, bus, name, dtype='float32'):
+        self.bus = bus
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.position = bus.total
+        self.dropped = 0
+        self._wake = threading.Event()
+
+    def seek(self, position=None):
+        """Moves the cursor to an absolute sample index, or to the live edge when None."""
+        self.position = self.bus.total if position is None else max(position, self.bus.oldest())
+
+    def available(self):
+        return self.bus.total - self.position
+
+    def read(self, n, timeout=None):
+        """
+        Blocks until n samples are available and returns them in this consumer's format.
+        Returns None on timeout or when the bus is stopped.
+        """
+        while self.available() < n:
+            self._wake.clear()
+            if self.available() >= n:
+                break
+            if not self._wake.wait(timeout) or self.bus._stream is None:
+                return None
+
+        # The writer lapped us — skip ahead rather than return overwritten audio
+        oldest = self.bus.oldest()
+        if self.position < oldest:
+            self.dropped += oldest - self.position
+            print(f"[CaptureBus] {self.name} overrun, dropped {oldest - self.position} samples", file=sys.stderr)
+            self.position = oldest
+
+        pcm = self.bus._copy(self.position, self.position + n)
+        self.position += n
+
+        if self.dtype == np.float32:
+            return pcm.astype(np.float32) / 32768.0
+        return pcm.astype(self.dtype, copy=False)
+
+    def close(self):
+        self.bus.unsubscribe(self)
@@ -1,22 +1,60 @@
 import sounddevice as sd
-import numpy as np
 from faster_whisper import WhisperModel
 import queue
+import threading
 import time
 import sys
+from contextlib import contextmanager
+from audio.vad import EnergyVAD, AudioRingBuffer
 
 class SpeechListener:
-    def __init__(self, model_size="tiny.en"):
+    def __init__(self, model_size="tiny.en", streaming=False, stream_interval=1.0, unstable_tail=1.5, max_window=8.0,
+                 vad=None, preroll=0.3, max_utterance=30.0, bus=None,
+                 use_worker_process=False, cpu_threads=0, num_workers=1, speculate_after=0.2):
         print(f"Loading Faster-Whisper model: {model_size}...")
-        self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
-        
+
+        # Worker-process mode keeps the model in a separate process, away from the GIL
+        self.model = None
+        self.worker = None
+        if use_worker_process:
+            from audio.stt_worker import STTWorker
+            self.worker = STTWorker(model_size, cpu_threads=cpu_threads, num_workers=num_workers,
+                                    max_seconds=max_utterance + preroll + 1)
+        else:
+            self.model = WhisperModel(model_size, device="cpu", compute_type="int8",
+                                      cpu_threads=cpu_threads, num_workers=num_workers)
+
         self.q = queue.Queue()
-        self.samplerate = 16000 
+        self.samplerate = 16000
         self.channels = 1
-        
 
-        self.silence_threshold = 100  
-        self.silence_duration = .8   
+        self.vad = vad or EnergyVAD(samplerate=self.samplerate)
+        self.silence_duration = .8
+        self.preroll = preroll
+        self.max_utterance = max_utterance
+        self.blocksize = self.vad.frame_length
+        self.ring = AudioRingBuffer(self.samplerate * (max_utterance + preroll + 1))
+
+        # Optional shared CaptureBus; without one listen() opens its own stream per turn
+        self.bus = bus
+        self._consumer = bus.subscribe('stt', dtype='float32') if bus else None
+
+        # Streaming mode: decode committed windows while the student is still talking.
+        # Only audio newer than `unstable_tail` seconds is re-decoded on the next pass,
+        # and the tail is force-committed once it grows past `max_window` seconds.
+        self.streaming = streaming
+        self.stream_interval = stream_interval
+        self.unstable_tail = unstable_tail
+        self.max_window = max_window
+        self.partial_text = ""
+
+        # Speculation: after `speculate_after` seconds of end-of-speech silence the
+        # utterance is decoded early and handed to on_speculate, so the reply can start
+        # before silence_duration runs out. The final decode reuses that result when no
+        # speech came in since.
+        self.speculate_after = speculate_after
+        self._decode_lock = threading.Lock()
+        self._decoded = None
         print("<<Whisper Model Loaded.>>")
 
     def callback(self, indata, frames, time, status):
@@ -25,60 +63,254 @@ class SpeechListener:
             print(status, file=sys.stderr)
         self.q.put(indata.copy())
 
-    def listen(self):
-    
+    def listen(self, on_partial=None, start=None, on_speculate=None, skip=0.0):
+        """
+        Records one utterance and returns its transcript.
+        In streaming mode, on_partial(text) is called with the running transcript while the student talks.
+        With a CaptureBus, `start` is the bus sample to begin from (e.g. WakeWordListener.detected_at).
+        on_speculate(text) is called from a helper thread with the likely final transcript once the
+        student has been silent for `speculate_after` seconds; it may fire again if they resume.
+        `skip` is how many seconds of live audio to ignore from now, e.g. an earcon that was just
+        started, so the speaker's own sound never reaches the VAD or Whisper.
+        """
 
         print("\n //Listening for speech... ")
-        audio_buffer = []
+        self.ring.reset()
+        self.vad.reset()
+        self._decoded = None
+        onset = None
         silence_start = None
-        speaking_started = False
-        
-        
-        with sd.InputStream(samplerate=self.samplerate, channels=self.channels, callback=self.callback):
+        speculated = False
+        preroll = int(self.samplerate * self.preroll)
+        max_samples = int(self.samplerate * self.max_utterance)
+
+        stream = _StreamingTranscriber(self, on_partial) if self.streaming else None
+
+
+        with self._open_source(start, skip) as read_block:
             while True:
-               
-                indata = self.q.get()
-                    
-                volume_norm = np.linalg.norm(indata) * 10
-                      
-                if volume_norm > self.silence_threshold:
-                    if not speaking_started:
+
+                indata = read_block()
+                if indata is None:
+                    break
+                self.ring.write(indata)
+
+                if self.vad.process(indata):
+                    if onset is None:
                         print("--> Voice detected")
-                        speaking_started = True
-                    silence_start = None 
+                        # Keep the pre-roll so the first syllable isn't clipped
+                        onset = max(self.ring.oldest(), self.ring.total - len(indata) - preroll)
+                        if stream:
+                            stream.start(onset)
+                    silence_start = None
+                    speculated = False
                 else:
-                    if speaking_started and silence_start is None:
-                        silence_start = time.time() 
-                
-                
-                if speaking_started:
-                    audio_buffer.append(indata)
-                
-                
-                if speaking_started and silence_start and (time.time() - silence_start > self.silence_duration):
+                    if onset is not None and silence_start is None:
+                        silence_start = time.time()
+
+                if on_speculate and silence_start and not speculated and time.time() - silence_start > self.speculate_after:
+                    speculated = True
+                    threading.Thread(target=self._speculate, args=(onset, stream, on_speculate), daemon=True).start()
+
+                if onset is not None and silence_start and (time.time() - silence_start > self.silence_duration):
                     print("--> Silence detected, processing...")
                     break
 
-        
-        if not audio_buffer:
+                if onset is not None and self.ring.total - onset >= max_samples:
+                    print("--> Max utterance length reached, processing...")
+                    break
+
+        if onset is None:
             return ""
-            
-        
-        audio_data = np.concatenate(audio_buffer, axis=0)
-        
-        audio_data = audio_data.flatten().astype(np.float32)
-  
-        segments, info = self.model.transcribe(audio_data, beam_size=1)
-        
+
+        if stream:
+            return stream.finish()
+
+        return self._decode_utterance(onset)
+
+    def stop(self):
+        """Shuts down the STT worker process, if one is running."""
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+
+    @contextmanager
+    def _open_source(self, start=None, skip=0.0):
+        """Yields a function returning the next float32 block, from the shared bus or a private stream."""
+        skip_samples = int(skip * self.samplerate)
+        if self._consumer:
+            if skip_samples:
+                # Audio from before the earcon ends is dropped, even if that is after `start`
+                live_edge = self.bus.total
+                start = max(live_edge if start is None else start, live_edge + skip_samples)
+            self._consumer.seek(start)
+            yield lambda: self._consumer.read(self.blocksize)
+            return
+
+        with sd.InputStream(samplerate=self.samplerate, channels=self.channels, blocksize=self.blocksize, callback=self.callback):
+            skipped = 0
+            while skipped < skip_samples:
+                skipped += len(self.q.get())
+            yield self.q.get
+
+        # Drop anything the callback queued after the stream closed
+        while not self.q.empty():
+            self.q.get_nowait()
+
+    def _decode_utterance(self, onset):
+        """Trims and transcribes the utterance so far, reusing the last result if no speech was added."""
+        audio_data = self.vad.trim(self.ring.get(onset), samplerate=self.samplerate)
+        if len(audio_data) == 0:
+            return ""
+
+        with self._decode_lock:
+            if self._decoded and self._decoded[0] == len(audio_data):
+                return self._decoded[1]
+            text = self.transcribe(audio_data)
+            self._decoded = (len(audio_data), text)
+        return text
+
+    def _speculate(self, onset, stream, on_speculate):
+        try:
+            text = stream.decode_tail() if stream else self._decode_utterance(onset)
+            if text:
+                on_speculate(text)
+        except Exception as e:
+            print(f"Speculative Transcript Error: {e}")
+
+    def segments(self, audio_data, initial_prompt=None):
+        """Runs Whisper over a float32 mono buffer and returns its segments as a list."""
+        if self.worker:
+            return self.worker.transcribe(audio_data, initial_prompt=initial_prompt)
+
+        segments, info = self.model.transcribe(audio_data, beam_size=1, initial_prompt=initial_prompt)
+        return list(segments)
+
+    def transcribe(self, audio_data, initial_prompt=None):
+        """Runs Whisper over a float32 mono buffer and returns the joined text."""
+        segments = self.segments(audio_data, initial_prompt=initial_prompt)
+
         full_text = ""
         for segment in segments:
             full_text += segment.text + " "
-            
+
         return full_text.strip()
 
+
+class _StreamingTranscriber:
+    """
+    Background decoder for SpeechListener's streaming mode.
+    Keeps a stable prefix of committed text and only re-decodes the audio after it.
+    """
+
+    def __init__(self, listener, on_partial=None):
+        self.listener = listener
+        self.on_partial = on_partial
+        self.onset = 0
+
+        self.committed_text = ""
+        self.committed_samples = 0
+        self.tail_text = ""
+        self._decoded_tail = None
+
+        self._stop = threading.Event()
+        self._model_lock = threading.Lock()
+        self._thread = None
+
+    def start(self, onset):
+        self.onset = onset
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def finish(self):
+        """Stops the background pass and decodes only the still-uncommitted tail."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.decode_tail()
+
+    def decode_tail(self):
+        """
+        Transcript of everything so far: the committed text plus a decode of the tail.
+        The tail result is reused while its trimmed length is unchanged, so a speculative
+        call during end-of-speech silence makes the final one free.
+        """
+        with self._model_lock:
+            audio = self._snapshot()
+            # Past the first commit the leading edge is mid-speech, so only trailing silence goes
+            tail = self.listener.vad.trim(
+                audio[self.committed_samples:],
+                samplerate=self.listener.samplerate,
+                leading=self.committed_samples == 0
+            )
+            key = (self.committed_samples, len(tail))
+            if self._decoded_tail and self._decoded_tail[0] == key:
+                tail_text = self._decoded_tail[1]
+            elif len(tail) > 0:
+                tail_text = self.listener.transcribe(tail, initial_prompt=self.committed_text or None)
+            else:
+                tail_text = ""
+            self._decoded_tail = (key, tail_text)
+            return _join(self.committed_text, tail_text)
+
+    def _snapshot(self):
+        return self.listener.ring.get(self.onset)
+
+    def _run(self):
+        sr = self.listener.samplerate
+        last_decoded = 0
+
+        while not self._stop.wait(self.listener.stream_interval):
+            audio = self._snapshot()
+            if len(audio) - last_decoded < sr * self.listener.stream_interval:
+                continue
+            last_decoded = len(audio)
+
+            # Held through the commit so decode_tail() never sees text and samples out of step
+            with self._model_lock:
+                tail = audio[self.committed_samples:]
+                segments = self.listener.segments(tail, initial_prompt=self.committed_text or None)
+
+                if self._stop.is_set():
+                    break
+
+                tail_seconds = len(tail) / sr
+                stable_until = tail_seconds - self.listener.unstable_tail
+                force_commit = tail_seconds > self.listener.max_window
+
+                # Commit every segment that ends before the unstable tail; the last one
+                # stays open unless the window has grown too long.
+                commit_end = 0.0
+                unstable = []
+                for i, segment in enumerate(segments):
+                    is_last = i == len(segments) - 1
+                    if segment.end <= stable_until and not (is_last and not force_commit):
+                        self.committed_text = _join(self.committed_text, segment.text)
+                        commit_end = segment.end
+                    else:
+                        unstable.append(segment.text)
+
+                self.committed_samples += int(commit_end * sr)
+                self.tail_text = " ".join(t.strip() for t in unstable)
+                self.listener.partial_text = _join(self.committed_text, self.tail_text)
+
+            if self.on_partial and self.listener.partial_text:
+                try:
+                    self.on_partial(self.listener.partial_text)
+                except Exception as e:
+                    print(f"Partial Transcript Error: {e}")
+
+
+def _join(prefix, text):
+    text = text.strip()
+    if not prefix:
+        return text
+    if not text:
+        return prefix
+    return f"{prefix} {text}"
+
 if __name__ == "__main__":
 
-    listener = SpeechListener()
-    result = listener.listen()
+    listener = SpeechListener(streaming=True)
+    result = listener.listen(on_partial=lambda text: print(f"... {text}"))
     print(f"Final Transcription: {result}")
-
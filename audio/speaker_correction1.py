@@ -4,9 +4,11 @@ import threading
 import time
 
 class AudioKeepAlive:
-    def __init__(self):
+    def __init__(self, output=None):
         self.running = False
         self.thread = None
+        # With a shared AudioOutput the tone is mixed in there (only while nothing else plays)
+        self.output = output
 
     def _play_noise(self):
         # Generates a 10Hz sine wave (Below human hearing range of 20Hz)
@@ -22,6 +24,12 @@ class AudioKeepAlive:
                 stream.write(tone)
 
     def start(self):
+        if self.output is not None:
+            self.running = True
+            self.output.keep_alive = True
+            print("<<Audio Keep-Alive Started>>")
+            return
+
         if not self.running:
             self.running = True
             self.thread = threading.Thread(target=self._play_noise, daemon=True)
@@ -30,5 +38,7 @@ class AudioKeepAlive:
 
     def stop(self):
         self.running = False
+        if self.output is not None:
+            self.output.keep_alive = False
         if self.thread:
             self.thread.join()
\ No newline at end of file
@@ -0,0 +1,65 @@
+from multiprocessing import shared_memory
+from collections import namedtuple
+from utils.shm_worker import SharedMemoryWorker
+import numpy as np
+import threading
+
+Segment = namedtuple("Segment", ["start", "end", "text"])
+
+
+def _worker_main(shm_name, capacity, model_size, cpu_threads, num_workers, requests, results):
+    """Child process: holds a preloaded WhisperModel and decodes audio placed in shared memory."""
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads, num_workers=num_workers)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    audio_view = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf)
+    results.put(("ready", None))
+
+    try:
+        while True:
+            job = requests.get()
+            if job is None:
+                break
+
+            job_id, n_samples, initial_prompt = job
+            try:
+                segments, info = model.transcribe(audio_view[:n_samples], beam_size=1, initial_prompt=initial_prompt)
+                results.put((job_id, [Segment(s.start, s.end, s.text) for s in segments]))
+            except Exception as e:
+                results.put((job_id, e))
+    finally:
+        del audio_view
+        shm.close()
+
+
+class STTWorker:
+    """
+    Long-lived Whisper decoder in its own process, so decoding doesn't fight the
+    camera, UI and TTS threads for the GIL. Audio goes over shared memory and
+    segments come back over a queue. One job runs at a time; a decode that takes
+    longer than `timeout` seconds kills and restarts the worker and raises, so a
+    wedged model can't hang the turn.
+    """
+
+    def __init__(self, model_size="tiny.en", cpu_threads=0, num_workers=1, max_seconds=32, samplerate=16000, timeout=20.0):
+        self.capacity = int(max_seconds * samplerate)
+        self._worker = SharedMemoryWorker(
+            "STTWorker", _worker_main, (self.capacity, model_size, cpu_threads, num_workers),
+            shm_size=self.capacity * 4, timeout=timeout
+        )
+        self._audio = np.ndarray((self.capacity,), dtype=np.float32, buffer=self._worker.shm.buf)
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio, initial_prompt=None):
+        """Decodes a float32 mono buffer in the worker and returns a list of Segment."""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)[-self.capacity:]
+
+        # The buffer is shared by every call, so hold it until the worker has answered
+        with self._lock:
+            self._audio[:len(audio)] = audio
+            return self._worker.call(len(audio), initial_prompt)
+
+    def stop(self):
+        del self._audio
+        self._worker.stop()
@@ -0,0 +1,296 @@
+from abc import ABC, abstractmethod
+import requests
+from requests.adapters import HTTPAdapter
+from collections import deque
+import statistics
+import subprocess
+import threading
+import shutil
+import queue
+import time
+
+# Every backend yields raw little-endian 16-bit mono PCM at this rate, matching AudioOutput
+SAMPLE_RATE = 22050
+
+
+class TTSBackend(ABC):
+    """Interface for a speech synthesizer. stream() yields PCM chunks and raises on failure."""
+
+    name = "base"
+
+    @abstractmethod
+    def stream(self, text):
+        pass
+
+    def cached(self, text):
+        """True when stream(text) will be served locally (e.g. from TTSCache) rather than synthesized."""
+        return False
+
+
+class ElevenLabsBackend(TTSBackend):
+    name = "elevenlabs"
+
+    def __init__(self, api_key, cache=None, base_url="https://api.elevenlabs.io", output_format=f"pcm_{SAMPLE_RATE}"):
+        self.api_key = api_key
+        self.voice_id = "CwhRBWXzGAHq8TQ4Fs17"
+        self.model_id = "eleven_turbo_v2_5"
+        self.voice_settings = {
+            "stability": 0.5,
+            "similarity_boost": 0.7
+        }
+        self.base_url = base_url.rstrip("/")
+        self.output_format = output_format
+        self.cache = cache
+
+        # One pooled keep-alive session, so only the first sentence pays the TLS handshake
+        self.session = requests.Session()
+        self.session.mount(self.base_url, HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers.update({
+            "Accept": "audio/pcm",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key
+        })
+
+    def stream(self, text):
+        """Yields PCM for `text`, from the cache or as it arrives from ElevenLabs."""
+        key = None
+        if self.cache:
+            key = self._key(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                print("<<Speech Cache Hit>>")
+                yield from cached
+                return
+
+        print("<<Generating Speech via ElevenLabs>>")
+        chunks = self._fetch(text)
+        if key:
+            chunks = self.cache.tee(key, chunks)
+        yield from chunks
+
+    def cached(self, text):
+        return bool(self.cache) and self._key(text) in self.cache
+
+    def prewarm(self, phrases):
+        """Synthesizes fixed phrases into the cache so they play instantly later."""
+        if not self.cache:
+            return
+        for text in phrases:
+            try:
+                for _ in self.stream(text):
+                    pass
+            except Exception as e:
+                print(f"Prewarm Error: {e}")
+
+    def _key(self, text):
+        return self.cache.key(text, voice_id=self.voice_id, model_id=self.model_id,
+                              voice_settings=self.voice_settings, output_format=self.output_format)
+
+    def _fetch(self, text):
+        url = f"{self.base_url}/v1/text-to-speech/{self.voice_id}/stream"
+
+        data = {
+            "text": text,
+            "model_id": self.model_id,
+            "voice_settings": self.voice_settings
+        }
+
+        with self.session.post(url, params={"output_format": self.output_format}, json=data, stream=True, timeout=(3, 10)) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Error from ElevenLabs: {response.text}")
+            for chunk in response.iter_content(chunk_size=4096):
+                if chunk:
+                    yield chunk
+
+
+class LocalTTSBackend(TTSBackend):
+    """
+    Offline synthesizer via espeak-ng, which writes a 22.05 kHz 16-bit WAV to stdout.
+    Robotic next to ElevenLabs, but it needs no network and starts in milliseconds.
+    """
+
+    name = "local"
+
+    def __init__(self, voice="en-us", speed=165, command="espeak-ng"):
+        if not shutil.which(command):
+            raise RuntimeError(f"{command} not found. Please install it with: sudo apt-get install {command}")
+        self.command = command
+        self.voice = voice
+        self.speed = speed
+
+    def stream(self, text):
+        print("<<Generating Speech via Local TTS>>")
+        proc = subprocess.Popen(
+            [self.command, "-v", self.voice, "-s", str(self.speed), "--stdout", text],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            header = proc.stdout.read(44)  # Canonical WAV header; espeak streams the data after it
+            if len(header) < 44:
+                raise RuntimeError(f"{self.command} produced no audio")
+            while True:
+                chunk = proc.stdout.read(4096)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+
+class _Attempt:
+    def __init__(self, backend):
+        self.backend = backend
+        self.cancelled = False
+        self.cached = False
+        self.started = time.time()
+
+
+_DONE = object()
+
+
+class TTSRouter(TTSBackend):
+    """
+    Routes synthesis across backends in preference order.
+
+    The preferred backend starts first. If it hasn't produced audio within
+    `hedge_after` seconds, or fails before producing any, the next backend is
+    started in parallel and whichever yields audio first wins; the loser is
+    cancelled. Rolling time-to-first-byte is tracked per backend, and a backend
+    that keeps failing is skipped for `cooldown` seconds. Cache hits are neither
+    hedged nor counted towards time-to-first-byte, since they say nothing about
+    how fast the backend synthesizes.
+    """
+
+    name = "router"
+
+    def __init__(self, *backends, hedge_after=0.8, window=20, max_failures=3, cooldown=30.0):
+        self.backends = list(backends)
+        self.hedge_after = hedge_after
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._ttfb = {b.name: deque(maxlen=window) for b in self.backends}
+        self._failures = {b.name: 0 for b in self.backends}
+        self._skip_until = {b.name: 0.0 for b in self.backends}
+
+    def stats(self):
+        """Median time-to-first-byte (s) and consecutive failures per backend."""
+        with self._lock:
+            return {
+                name: {
+                    "ttfb_median": statistics.median(samples) if samples else None,
+                    "samples": len(samples),
+                    "failures": self._failures[name],
+                }
+                for name, samples in self._ttfb.items()
+            }
+
+    def stream(self, text):
+        candidates = [b for b in self.backends if self._available(b)] or list(self.backends)
+        events = queue.Queue()
+        attempts = []
+        winner = None
+
+        def launch():
+            backend = candidates[len(attempts)]
+            attempt = _Attempt(backend)
+            attempt.cached = backend.cached(text)
+            attempts.append(attempt)
+            threading.Thread(target=self._run, args=(attempt, text, events), daemon=True).start()
+
+        launch()
+        finished = 0
+        try:
+            while True:
+                can_hedge = winner is None and len(attempts) < len(candidates) and not attempts[-1].cached
+                timeout = None
+                if can_hedge:
+                    deadline = attempts[-1].started + self._hedge_delay(attempts[-1].backend)
+                    timeout = max(0.0, deadline - time.time())
+                try:
+                    attempt, item = events.get(timeout=timeout)
+                except queue.Empty:
+                    print(f"[TTSRouter] {attempts[-1].backend.name} slow, hedging with {candidates[len(attempts)].name}")
+                    launch()
+                    continue
+
+                if winner is None:
+                    if isinstance(item, bytes):
+                        winner = attempt
+                        for other in attempts:
+                            if other is not winner:
+                                other.cancelled = True
+                    else:
+                        finished += 1
+                        if isinstance(item, Exception):
+                            print(f"[TTSRouter] {attempt.backend.name} failed: {item}")
+                        if len(attempts) < len(candidates):
+                            launch()
+                        elif finished == len(attempts):
+                            raise RuntimeError("All TTS backends failed")
+                        continue
+
+                if attempt is not winner:
+                    continue
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for attempt in attempts:
+                attempt.cancelled = True
+
+    def _hedge_delay(self, backend):
+        """
+        How long to give a backend before hedging: hedge_after at most, but sooner
+        when the backend is normally much faster than that.
+        """
+        with self._lock:
+            samples = self._ttfb[backend.name]
+            if len(samples) < 5:
+                return self.hedge_after
+            return min(self.hedge_after, 2 * statistics.median(samples))
+
+    def _available(self, backend):
+        with self._lock:
+            return time.time() >= self._skip_until[backend.name]
+
+    def _record(self, backend, ttfb=None, failed=False):
+        with self._lock:
+            name = backend.name
+            if failed:
+                self._failures[name] += 1
+                if self._failures[name] >= self.max_failures:
+                    self._skip_until[name] = time.time() + self.cooldown
+                    self._failures[name] = 0
+                    print(f"[TTSRouter] {name} keeps failing, skipping it for {self.cooldown:.0f}s")
+            else:
+                self._failures[name] = 0
+                if ttfb is not None:
+                    self._ttfb[name].append(ttfb)
+
+    def _run(self, attempt, text, events):
+        stream = attempt.backend.stream(text)
+        first = True
+        try:
+            for chunk in stream:
+                if attempt.cancelled:
+                    break
+                if first:
+                    first = False
+                    self._record(attempt.backend, ttfb=None if attempt.cached else time.time() - attempt.started)
+                events.put((attempt, chunk))
+            if first and not attempt.cancelled:
+                raise RuntimeError("no audio returned")
+            events.put((attempt, _DONE))
+        except Exception as e:
+            self._record(attempt.backend, failed=True)
+            events.put((attempt, e))
+        finally:
+            stream.close()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Canonical form of a phrase for cache keys: NFC, trimmed, single-spaced."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache of synthesized audio.
+
+    Entries are keyed by a hash of everything that changes the audio (voice, model,
+    voice settings, output format and normalized text). index.json keeps entries in
+    least-recently-used order and the cache evicts from the front once it exceeds
+    max_bytes. Hits reorder the index too; that is written back save_interval
+    seconds after the first unsaved hit, so a run of hits costs one write.
+    """
+
+    def __init__(self, cache_dir="cache/tts", max_bytes=50 * 1024 * 1024, chunk_size=4096, save_interval=30.0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.save_interval = save_interval
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._pending_save = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+        self._size = sum(self._index.values())
+
+    def key(self, text, **params):
+        payload = json.dumps({"text": normalize_text(text), **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._index
+
+    def get(self, key):
+        """Yields the cached audio in chunks, or returns None on a miss."""
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+            if self._pending_save is None:
+                self._pending_save = threading.Timer(self.save_interval, self._save_recency)
+                self._pending_save.daemon = True
+                self._pending_save.start()
+        return self._read(key)
+
+    def tee(self, key, chunks):
+        """
+        Passes chunks through unchanged while writing them to the cache.
+        The entry is only committed if the stream runs to completion with data.
+        """
+        tmp_path = self._path(key) + f".{threading.get_ident()}.part"
+        size = 0
+        completed = False
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            completed = size > 0
+        finally:
+            if completed:
+                os.replace(tmp_path, self._path(key))
+                self._add(key, size)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+        except FileNotFoundError:
+            with self._lock:
+                self._size -= self._index.pop(key, 0)
+
+    def _add(self, key, size):
+        with self._lock:
+            self._size += size - self._index.pop(key, 0)
+            self._index[key] = size
+            while self._size > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self._size -= old_size
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+            self._save_index()
+
+    def _save_recency(self):
+        with self._lock:
+            self._pending_save = None
+            self._save_index()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.audio")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return OrderedDict()
+        return OrderedDict((k, v) for k, v in entries if os.path.exists(self._path(k)))
+
+    def _save_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(list(self._index.items()), f)
+        os.replace(tmp, self._index_path)
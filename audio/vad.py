@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+def frame_features(audio, frame_length):
+    """
+    Splits a mono float32 buffer into whole frames and returns (energy_db, zcr) per frame.
+    Any trailing partial frame is ignored.
+    """
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty
+
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+    return energy_db, zcr
+
+
+class AudioRingBuffer:
+    """
+    Preallocated mono float32 ring buffer addressed by absolute sample index.
+    Written from one thread, read (as copies) from any thread.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self.total = 0  # Samples ever written
+
+    def reset(self):
+        self.total = 0
+
+    def write(self, block):
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        n = len(block)
+        if n >= self.capacity:
+            block = block[-self.capacity:]
+            self.total += n - self.capacity
+            n = self.capacity
+
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = block[:first]
+        self._data[:n - first] = block[first:]
+        self.total += n
+
+    def oldest(self):
+        return max(0, self.total - self.capacity)
+
+    def get(self, start, end=None):
+        """Returns a copy of samples [start, end); start is clamped to what is still held."""
+        end = self.total if end is None else min(end, self.total)
+        start = max(start, self.oldest())
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+
+        a = start % self.capacity
+        b = end % self.capacity
+        if a < b:
+            return self._data[a:b].copy()
+        return np.concatenate((self._data[a:], self._data[:b]))
+
+
+class VoiceActivityDetector(ABC):
+    """Interface for SpeechListener's VAD stage. Subclasses decide per block whether speech is present."""
+
+    frame_length = 480
+
+    def reset(self):
+        """Clears per-utterance state. Learned background levels are kept."""
+        pass
+
+    @abstractmethod
+    def process(self, block):
+        """Feeds one block of float32 samples, returns True while speech is active."""
+
+    @abstractmethod
+    def speech_mask(self, audio):
+        """Per-frame speech decisions for a whole buffer, without adapting internal state."""
+
+    def trim(self, audio, pad_ms=150, samplerate=16000, leading=True):
+        """Cuts leading and trailing non-speech off an utterance, keeping pad_ms around the speech."""
+        mask = self.speech_mask(audio)
+        speech = np.flatnonzero(mask)
+        if len(speech) == 0:
+            return audio[:0]
+
+        pad = int(samplerate * pad_ms / 1000)
+        start = max(0, speech[0] * self.frame_length - pad) if leading else 0
+        end = min(len(audio), (speech[-1] + 1) * self.frame_length + pad)
+        return audio[start:end]
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """
+    Energy + zero-crossing VAD with an adaptive noise floor.
+    The floor tracks quiet frames quickly and drifts up slowly during speech,
+    so a fan turning on or a louder room doesn't read as talking forever.
+    """
+
+    def __init__(self, samplerate=16000, frame_ms=30, margin_db=10.0, min_speech_db=-55.0,
+                 max_zcr=0.45, onset_frames=2, floor_attack=0.05, floor_release=0.002):
+        self.samplerate = samplerate
+        self.frame_length = int(samplerate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.max_zcr = max_zcr
+        self.onset_frames = onset_frames
+        self.floor_attack = floor_attack
+        self.floor_release = floor_release
+        self.noise_floor = None
+        self.reset()
+
+    def reset(self):
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._run = 0
+        self.active = False
+
+    def _classify(self, energy_db, zcr):
+        floor = self.noise_floor if self.noise_floor is not None else self.min_speech_db
+        threshold = max(floor + self.margin_db, self.min_speech_db)
+        return (energy_db > threshold) & (zcr < self.max_zcr)
+
+    def process(self, block):
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        if len(self._carry):
+            block = np.concatenate((self._carry, block))
+
+        energy_db, zcr = frame_features(block, self.frame_length)
+        self._carry = block[len(energy_db) * self.frame_length:]
+        if len(energy_db) == 0:
+            return self.active
+
+        if self.noise_floor is None:
+            self.noise_floor = float(np.min(energy_db))
+
+        mask = self._classify(energy_db, zcr)
+
+        # Adapt the floor in one step per block using the block's quiet frames
+        quiet = energy_db[~mask]
+        if len(quiet):
+            self.noise_floor += self.floor_attack * (float(np.mean(quiet)) - self.noise_floor)
+        else:
+            self.noise_floor += self.floor_release * (float(np.mean(energy_db)) - self.noise_floor)
+
+        # Length of the run of speech frames ending at this block
+        gaps = np.flatnonzero(~mask)
+        self._run = self._run + len(mask) if len(gaps) == 0 else len(mask) - gaps[-1] - 1
+
+        if self.active:
+            self.active = bool(mask.any())
+        else:
+            self.active = self._run >= self.onset_frames
+        return self.active
+
+    def speech_mask(self, audio):
+        energy_db, zcr = frame_features(np.asarray(audio, dtype=np.float32).reshape(-1), self.frame_length)
+        return self._classify(energy_db, zcr)
@@ -4,7 +4,7 @@ import struct
 import os
 
 class WakeWordListener:
-    def __init__(self, access_key):
+    def __init__(self, access_key, bus=None):
         keyword_file = 'assets/Hey_Nova.ppn' 
         
 
@@ -20,9 +20,19 @@ class WakeWordListener:
             print(f"Error loading Porcupine: {e}")
             raise
 
-    def listen(self):
+        # With a shared CaptureBus the stream never closes, and detected_at marks
+        # the bus sample right after the wake word so STT can start from there.
+        self.bus = bus
+        self.detected_at = None
+        self._consumer = bus.subscribe('wakeword', dtype='int16') if bus else None
+
+    def listen(self, cancel=None):
+        """Blocks until the wake word is heard (True) or the optional cancel Event is set (False)."""
         print(f"<Listening for 'Hey Nova'...>")
-        
+
+        if self._consumer:
+            return self._listen_bus(cancel)
+
         with sd.InputStream(
             samplerate=self.porcupine.sample_rate,
             channels=1,
@@ -30,6 +40,8 @@ class WakeWordListener:
             blocksize=self.porcupine.frame_length
         ) as stream:
             while True:
+                if cancel is not None and cancel.is_set():
+                    return False
 
                 pcm, overflow = stream.read(self.porcupine.frame_length)
                 
@@ -39,4 +51,23 @@ class WakeWordListener:
                 
                 if keyword_index >= 0:
                     print("<'Hey Nova' Detected>")
-                    return True
\ No newline at end of file
+                    return True
+
+    def _listen_bus(self, cancel=None):
+        self._consumer.seek()
+        while True:
+            if cancel is not None and cancel.is_set():
+                return False
+
+            pcm = self._consumer.read(self.porcupine.frame_length, timeout=0.1)
+            if pcm is None:
+                if self.bus._stream is None:
+                    return False
+                continue
+
+            keyword_index = self.porcupine.process(pcm.tolist())
+
+            if keyword_index >= 0:
+                self.detected_at = self._consumer.position
+                print("<'Hey Nova' Detected>")
+                return True
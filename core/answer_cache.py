@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+
+CONTRACTIONS = {
+    "what's": "what is", "whats": "what is", "how's": "how is", "where's": "where is",
+    "who's": "who is", "that's": "that is", "it's": "it is", "what're": "what are",
+    "can't": "cannot", "don't": "do not", "doesn't": "does not", "isn't": "is not",
+}
+
+# Leading fluff that doesn't change the question
+FILLERS = re.compile(r"^(?:(?:hey|hi|um+|uh+|so|okay|ok|nova|please|can you|could you|tell me|explain)\s+)+")
+
+# Questions that lean on earlier turns or on the student personally can't be answered from a cache
+CONTEXT_WORDS = {"it", "that", "this", "those", "these", "again", "more", "previous", "last", "i", "me", "my", "mine", "emotion", "feel", "feeling"}
+
+# Words that don't change what is being asked; everything else must match exactly for a hit
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "what", "how", "why", "who", "where", "when", "which",
+    "do", "does", "did", "of", "in", "on", "to", "for", "and", "or", "with", "about", "by", "can", "you",
+    "would", "should", "there", "mean", "means", "meaning", "define", "definition", "exactly", "really",
+}
+
+_PRIME = (1 << 31) - 1
+
+
+def normalize_question(text):
+    text = text.lower().replace("’", "'")
+    for short, full in CONTRACTIONS.items():
+        text = re.sub(rf"\b{re.escape(short)}\b", full, text)
+    text = re.sub(r"[^a-z0-9' ]+", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return FILLERS.sub("", text).strip()
+
+
+def content_key(normalized):
+    """Numbers and content words of a normalized question; near-duplicates must agree on both."""
+    words = normalized.split()
+    numbers = tuple(w for w in words if any(c.isdigit() for c in w))
+    content = frozenset(w for w in words if w not in STOPWORDS and w not in CONTEXT_WORDS and w not in numbers)
+    return numbers, content
+
+
+def char_ngrams(text, n=3):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class AnswerCache:
+    """
+    Local cache of Nova's answers to standalone questions.
+
+    Questions are normalized, shingled into character trigrams and MinHashed, so
+    "what's recursion" and "what is recursion?" land on the same entry. MinHash is
+    only a prefilter: a hit also needs the same numbers and the same content words
+    (stopwords aside), so "12 times 13" never answers "12 times 14" and "binary
+    search" never answers "binary search tree". Entries are
+    bucketed by the coarse mood from EmotionEngine.get_mood(), so a frustrated
+    student doesn't get the answer written for a confident one. Entries expire after
+    `ttl` seconds and the least recently used are evicted past `max_entries`.
+    """
+
+    def __init__(self, path="cache/answers.json", threshold=0.9, ttl=7 * 24 * 3600, max_entries=500, num_perm=64):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        rng = np.random.default_rng(1234)  # Fixed seed: signatures must match across runs
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+
+        self._lock = threading.Lock()
+        self._entries = []
+        self._signatures = np.zeros((0, num_perm), dtype=np.int64)
+        self._load()
+
+    def cacheable(self, question):
+        words = normalize_question(question).split()
+        return len(words) >= 2 and not (set(words) & CONTEXT_WORDS)
+
+    def lookup(self, question, mood=None):
+        """Returns the cached answer for a near-duplicate question in the same mood bucket, or None."""
+        if not self.cacheable(question):
+            return None
+        normalized = normalize_question(question)
+        signature = self._signature(normalized)
+        key = content_key(normalized)
+        bucket = mood or "none"
+        now = time.time()
+
+        with self._lock:
+            if not self._entries:
+                return None
+            estimates = np.mean(self._signatures == signature, axis=1)
+            for i in np.argsort(-estimates):
+                if estimates[i] < self.threshold * 0.75:
+                    break
+                entry = self._entries[i]
+                if entry["bucket"] != bucket or now - entry["created"] > self.ttl:
+                    continue
+                if content_key(entry["normalized"]) != key:
+                    continue
+                # Confirm the MinHash estimate with an exact trigram Jaccard
+                a, b = char_ngrams(normalized), char_ngrams(entry["normalized"])
+                if len(a & b) / len(a | b) >= self.threshold:
+                    entry["last_used"] = now
+                    entry["hits"] += 1
+                    print(f"[AnswerCache] Hit for '{question}' (matched '{entry['question']}')")
+                    return entry["answer"]
+        return None
+
+    def store(self, question, answer, mood=None):
+        if not self.cacheable(question) or not answer.strip():
+            return
+        normalized = normalize_question(question)
+        now = time.time()
+        entry = {
+            "question": question,
+            "normalized": normalized,
+            "bucket": mood or "none",
+            "answer": answer,
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+        }
+
+        with self._lock:
+            # Replace an exact duplicate rather than keeping both
+            keep = [i for i, e in enumerate(self._entries)
+                    if not (e["normalized"] == normalized and e["bucket"] == entry["bucket"])]
+            self._entries = [self._entries[i] for i in keep] + [entry]
+            self._signatures = np.vstack([self._signatures[keep], self._signature(normalized)])
+            self._evict(now)
+            self._save()
+
+    def _signature(self, normalized):
+        shingles = char_ngrams(normalized)
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") % _PRIME for s in shingles],
+            dtype=np.int64
+        )
+        return np.min((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME, axis=1)
+
+    def _evict(self, now):
+        keep = [i for i, e in enumerate(self._entries) if now - e["created"] <= self.ttl]
+        if len(keep) > self.max_entries:
+            keep.sort(key=lambda i: self._entries[i]["last_used"])
+            keep = sorted(keep[-self.max_entries:])
+        if len(keep) != len(self._entries):
+            self._entries = [self._entries[i] for i in keep]
+            self._signatures = self._signatures[keep]
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if not entries:
+            return
+        self._entries = entries
+        self._signatures = np.array([self._signature(e["normalized"]) for e in entries], dtype=np.int64).reshape(len(entries), -1)
+        self._evict(time.time())
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+SYSFS_VIDEO = "/sys/class/video4linux"
+BY_ID = "/dev/v4l/by-id"
+
+# Pi SoC nodes (codec, ISP, HEVC decoder, camera backend) show up as video devices but aren't cameras
+NOT_CAMERAS = re.compile(r"bcm2835|codec|isp|rpivid|pispbe|hevc|unicam|rp1-cfe", re.IGNORECASE)
+
+
+@contextmanager
+def quiet_stderr():
+    """Silences OpenCV's stderr spam while probing devices."""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    old_stderr = os.dup(2)
+    os.dup2(devnull, 2)
+    try:
+        yield
+    finally:
+        # Always restore stderr
+        os.dup2(old_stderr, 2)
+        os.close(devnull)
+        os.close(old_stderr)
+
+
+class CameraLocator:
+    """
+    Finds the USB camera without brute-forcing cv2.VideoCapture over indices.
+
+    Capture nodes are listed from sysfs (skipping metadata nodes and the Pi's
+    codec/ISP devices) and matched to their stable /dev/v4l/by-id names. The
+    last camera that worked is remembered in `state_path` and tried first. A
+    background watcher polls those directories so reconnects happen as soon as
+    the camera is plugged back in, instead of on a blind retry timer.
+    """
+
+    def __init__(self, state_path="cache/camera.json", sysfs=SYSFS_VIDEO, by_id=BY_ID, fallback_indices=range(1, 6)):
+        self.state_path = state_path
+        self.sysfs = sysfs
+        self.by_id = by_id
+        self.fallback_indices = list(fallback_indices)  # Used only where sysfs isn't available
+
+        self.changed = threading.Event()  # Set by the watcher when devices appear or disappear
+        self._watching = False
+        self._watch_thread = None
+
+    def candidates(self):
+        """Capture devices as dicts (device, name, id), the remembered camera first, then USB ones."""
+        if not os.path.isdir(self.sysfs):
+            return [{"device": i, "name": f"index {i}", "id": None} for i in self.fallback_indices]
+
+        stable_ids = {}
+        if os.path.isdir(self.by_id):
+            for link in os.listdir(self.by_id):
+                stable_ids[os.path.realpath(os.path.join(self.by_id, link))] = link
+
+        found = []
+        for node in sorted(os.listdir(self.sysfs), key=lambda n: int(re.sub(r"\D", "", n) or 0)):
+            base = os.path.join(self.sysfs, node)
+            name = _read(os.path.join(base, "name")) or node
+            # index 0 is the capture interface; higher ones are UVC metadata nodes
+            if _read(os.path.join(base, "index")) not in (None, "0") or NOT_CAMERAS.search(name):
+                continue
+            device = f"/dev/{node}"
+            found.append({"device": device, "name": name, "id": stable_ids.get(device)})
+
+        remembered = self._remembered()
+        found.sort(key=lambda c: (remembered is None or c["id"] != remembered, "usb" not in (c["id"] or "")))
+        return found
+
+    def open(self, cv2):
+        """Opens the first candidate that delivers a frame. Returns (cap, candidate) or (None, None)."""
+        with quiet_stderr():
+            for candidate in self.candidates():
+                device = candidate["device"]
+                if isinstance(device, str):
+                    cap = cv2.VideoCapture(device, cv2.CAP_V4L2)
+                else:
+                    cap = cv2.VideoCapture(device)
+                if cap.isOpened() and cap.grab():
+                    self._remember(candidate)
+                    return cap, candidate
+                cap.release()
+        return None, None
+
+    def wait_for_change(self, timeout):
+        """Blocks until the watcher sees devices change, or `timeout` seconds pass. Returns True on a change."""
+        changed = self.changed.wait(timeout)
+        self.changed.clear()
+        return changed
+
+    def watch(self, poll=0.5):
+        """Starts the hot-plug watcher (a cheap directory poll, no udev dependency)."""
+        if self._watching:
+            return
+        self._watching = True
+        self._watch_thread = threading.Thread(target=self._watch, args=(poll,), daemon=True)
+        self._watch_thread.start()
+
+    def stop(self):
+        self._watching = False
+
+    def _watch(self, poll):
+        last = self._snapshot()
+        while self._watching:
+            time.sleep(poll)
+            current = self._snapshot()
+            if current != last:
+                added = current - last
+                if added:
+                    print(f"[CameraLocator] Video device(s) appeared: {', '.join(sorted(added))}")
+                last = current
+                self.changed.set()
+
+    def _snapshot(self):
+        entries = set()
+        for directory in (self.sysfs, self.by_id):
+            try:
+                entries.update(os.listdir(directory))
+            except OSError:
+                pass
+        return entries
+
+    def _remembered(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f).get("id")
+        except (OSError, ValueError):
+            return None
+
+    def _remember(self, candidate):
+        if not candidate["id"] or candidate["id"] == self._remembered():
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            with open(self.state_path, "w") as f:
+                json.dump({"id": candidate["id"], "name": candidate["name"]}, f)
+        except OSError as e:
+            print(f"[CameraLocator] Could not save camera choice: {e}")
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
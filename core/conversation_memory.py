@@ -0,0 +1,119 @@
+import threading
+
+SUMMARY_PROMPT = """You maintain the running memory of a tutoring session between Nova (an AI tutor) and a student.
+Merge the existing summary and the new exchanges into one compact summary of at most {max_words} words.
+Keep: topics covered, what the student understood or struggled with, open questions, and anything the student said about themselves.
+Drop: pleasantries, exact wording, and anything Nova already fully explained.
+
+Existing summary:
+{summary}
+
+New exchanges:
+{turns}
+
+Updated summary:"""
+
+
+def estimate_tokens(text):
+    """Cheap offline token estimate (~4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Token-budgeted chat history for AIAgent.
+
+    Turns are stored as plain (student, nova) text without prompt scaffolding.
+    When the stored turns exceed `token_budget`, the oldest ones (always keeping
+    `keep_recent`) are folded into a running summary on a background thread.
+    build_history() returns a bounded Gemini history: the summary followed by the
+    recent turns.
+    """
+
+    def __init__(self, summarizer, token_budget=1500, keep_recent=3, summary_words=120):
+        self.summarizer = summarizer  # Any object with generate_content(prompt) -> response.text
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summary_words = summary_words
+
+        self.summary = ""
+        self.turns = []
+        self._lock = threading.Lock()
+        self._folding = False
+
+    def add_turn(self, user_text, reply_text):
+        with self._lock:
+            self.turns.append((user_text, reply_text))
+            should_fold = not self._folding and self._tokens() > self.token_budget and len(self.turns) > self.keep_recent
+            if should_fold:
+                self._folding = True
+
+        if should_fold:
+            threading.Thread(target=self._fold, daemon=True).start()
+
+    def build_history(self):
+        """Gemini-format history: optional summary exchange, then the recent turns."""
+        with self._lock:
+            summary = self.summary
+            turns = list(self.turns)
+
+        # Hard cap even if folding is behind: keep the newest turns that fit the budget
+        budget = self.token_budget - estimate_tokens(summary)
+        window = []
+        for user_text, reply_text in reversed(turns):
+            budget -= estimate_tokens(user_text) + estimate_tokens(reply_text)
+            if budget < 0 and window:
+                break
+            window.append((user_text, reply_text))
+        turns = window[::-1]
+
+        history = []
+        if summary:
+            history.append({"role": "user", "parts": [f"[SESSION MEMORY]\n{summary}\n[END SESSION MEMORY]"]})
+            history.append({"role": "model", "parts": ["Understood, I'll keep that in mind."]})
+        for user_text, reply_text in turns:
+            history.append({"role": "user", "parts": [user_text]})
+            history.append({"role": "model", "parts": [reply_text]})
+        return history
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+
+    def _tokens(self):
+        total = estimate_tokens(self.summary)
+        for user_text, reply_text in self.turns:
+            total += estimate_tokens(user_text) + estimate_tokens(reply_text)
+        return total
+
+    def _fold(self):
+        """Summarizes the oldest turns into self.summary. Runs off the conversation thread."""
+        try:
+            with self._lock:
+                count = len(self.turns) - self.keep_recent
+                old_turns = self.turns[:count]
+                summary = self.summary
+
+            transcript = "\n".join(f"Student: {u}\nNova: {r}" for u, r in old_turns)
+            prompt = SUMMARY_PROMPT.format(
+                max_words=self.summary_words,
+                summary=summary or "(none yet)",
+                turns=transcript
+            )
+            new_summary = self.summarizer.generate_content(prompt).text.strip()
+
+            with self._lock:
+                # New turns may have arrived meanwhile; only drop the ones we folded
+                if self.turns[:count] == old_turns:
+                    self.turns = self.turns[count:]
+                    self.summary = new_summary
+            print(f"[Memory] Folded {count} turns into summary ({estimate_tokens(new_summary)} tokens).")
+
+        except Exception as e:
+            # Keep the raw turns; the next add_turn will try again
+            print(f"[Memory] Summarization failed: {e}")
+
+        finally:
+            with self._lock:
+                self._folding = False
@@ -1,46 +1,93 @@
 # emotion_engine.py
 import cv2
 import time
-import os
 import threading
-from collections import deque, Counter
-from deepface import DeepFace
+import numpy as np
+from contextlib import contextmanager
+from core.scan_scheduler import ScanScheduler
+from core.emotion_store import EmotionStore, EMOTIONS
+from core.camera_locator import CameraLocator
+from core.face_tracker import FaceTracker
+
+# Readings below this (dominant emotion probability, %) stay out of history, whether from a single scan or a fused burst
+MIN_CONFIDENCE = 80.0
 
 
 class EmotionEngine:
-    def __init__(self, history_size=10, scan_interval=3):
+    def __init__(self, history_size=10, scan_interval=3, capture_fps=2, on_demand=False, frame_size=(320, 240),
+                 use_worker_process=False, scheduler=None, burst_size=4, burst_spacing=0.4, burst_wait=0.5,
+                 locator=None):
         self.fail_count = 0
-        self.history = deque(maxlen=history_size)
+        self.history = EmotionStore(capacity=history_size)  # Ring buffer + decayed aggregates + session file
         self.scan_interval = scan_interval
-        self._lock = threading.Lock()
         self._running = False
         self._thread = None
         self.cap = None
-        self._latest_frame = None
+        self.locator = locator or CameraLocator()
+        self.tracker = FaceTracker()  # Keeps scans on the student's face ROI between full-frame detections
         self._frame_lock = threading.Lock()
         self._frame_thread = None
 
+        # Scan cadence follows the UI state, SoC temperature and CPU load (see set_activity)
+        self.scheduler = scheduler or ScanScheduler(scan_interval=scan_interval)
+        self._wake = threading.Event()
+
+        # Capture: the camera is asked for `frame_size` at `capture_fps` directly. Paced mode
+        # dequeues every frame (cheap) but only decodes capture_fps of them; on-demand mode has
+        # no grabber thread and decodes one frame per scan. Frames are decoded into two
+        # preallocated buffers and the front one is swapped in under _frame_lock.
+        self.capture_fps = capture_fps
+        self.on_demand = on_demand
+        self.frame_size = frame_size
+        self._buffers = [np.empty((frame_size[1], frame_size[0], 3), dtype=np.uint8) for _ in range(2)]
+        self._front = 0
+        self._checked_out = {}    # Buffer index -> readers (scan loop, burst); never written while held
+        self._frame_seq = 0
+        self._raw = None          # Decode target when the camera can't deliver frame_size itself
+        self._native_size = False
+        self._capture_failures = 0
+
+        # Worker-process mode runs DeepFace out of process; history stays here, so a worker restart loses nothing
+        self.use_worker_process = use_worker_process
+        self._worker = None
+
+        # Burst mode: while the student talks (UI state 'listening'), up to `burst_size` frames
+        # are captured `burst_spacing` apart and analyzed in one batched call. The fused
+        # reading lands in history by the time the transcript is ready; get_context_and_mood() waits
+        # up to `burst_wait` seconds for it.
+        self.burst_size = burst_size
+        self.burst_spacing = burst_spacing
+        self.burst_wait = burst_wait
+        self._burst_frames = np.empty((burst_size, frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        self._burst_count = 0
+        self._burst_stop = threading.Event()
+        self._burst_done = threading.Event()
+        self._burst_done.set()
+        self._capture_lock = threading.Lock()
+
     # -------------------------------------------------------------------------
     # PUBLIC METHODS
     # -------------------------------------------------------------------------
 
     def start(self):
         """Auto-detect USB camera and start background threads."""
-        camera_index = self._find_camera()
-
-        if camera_index is None:
+        if not self._open_camera():
             print("[EmotionEngine] WARNING: Could not find any working USB camera. Emotion detection disabled.")
             return
+        self.locator.watch()
 
-        self.cap = cv2.VideoCapture(camera_index)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)   # Full res for better detection
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if self.use_worker_process:
+            from core.emotion_worker import EmotionWorker
+            self._worker = EmotionWorker(self.frame_size, slots=len(self._buffers) + self.burst_size)
+            # Capture straight into the worker's shared memory, so analysis never copies a frame
+            self._buffers = list(self._worker.frames[:len(self._buffers)])
+            self._burst_frames = self._worker.frames[len(self._buffers):]
 
         self._running = True
 
-        self._frame_thread = threading.Thread(target=self._frame_grabber, daemon=True)
-        self._frame_thread.start()
+        if not self.on_demand:
+            self._frame_thread = threading.Thread(target=self._frame_grabber, daemon=True)
+            self._frame_thread.start()
 
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._thread.start()
@@ -55,23 +102,71 @@ class EmotionEngine:
         time.sleep(0.3)
         if self.cap:
             self.cap.release()
+        if self._worker:
+            self._worker.stop()
+        self.locator.stop()
+        self.history.close()
         print("[EmotionEngine] Stopped.")
 
-    def get_context(self):
+    def set_activity(self, state):
+        """Tells the engine what Nova is doing (a UI state). Scans right away if the new state wants denser scanning."""
+        if self.scheduler.set_state(state):
+            self._wake.set()
+
+        if state == 'listening':
+            self.begin_burst()
+        else:
+            self.end_burst()
+
+    def begin_burst(self):
+        """Starts collecting a burst of frames for one batched analysis."""
+        if not self._running or not self.burst_size or not self._burst_done.is_set():
+            return
+        self._burst_count = 0
+        self._burst_stop.clear()
+        self._burst_done.clear()
+        threading.Thread(target=self._burst_loop, daemon=True).start()
+
+    def end_burst(self):
+        """Stops collecting; the frames gathered so far are analyzed right away."""
+        self._burst_stop.set()
+
+    def get_context_and_mood(self):
+        """
+        Called by TurnPipeline right before sending to Gemini. Waits (once, at most
+        burst_wait seconds) for this utterance's burst, then returns (context, mood)
+        from the same summary.
+        """
+        self._burst_done.wait(self.burst_wait)
+        summary = self.history.summary(stale_after=30)
+        return self._context(summary), self._mood(summary)
+
+    def get_context(self, wait=True):
         """
-        Called by main.py right before sending to Gemini.
         Returns a plain English summary, or None if no valid face data exists.
+        With wait=False (speculative requests) a running burst is not waited for.
+        """
+        if wait:
+            self._burst_done.wait(self.burst_wait)
+        return self._context(self.history.summary(stale_after=30))
+
+    def get_mood(self, wait=True):
         """
-        with self._lock:
-            if not self.history:
-                return None  # No data — main.py will skip emotion context
+        Coarse mood bucket from recent readings: 'negative', 'positive', 'neutral',
+        or None when there is no fresh face data. Used to key cached answers.
+        """
+        if wait:
+            self._burst_done.wait(self.burst_wait)
+        return self._mood(self.history.summary(stale_after=30))
 
-            # Discard stale data if student stepped away for 30+ seconds
-            most_recent_time = self.history[-1]['timestamp']
-            if time.time() - most_recent_time > 30:
-                return None
+    # -------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # -------------------------------------------------------------------------
 
-            emotions = [item["emotion"] for item in self.history]
+    def _context(self, summary):
+        # None with no data, or stale data if student stepped away for 30+ seconds
+        if summary is None:
+            return None  # main.py will skip emotion context
 
         context_map = {
             "angry":    "frustrated or struggling to understand the material, please try to make the most nice and kindest approach to explaining a concept. Be forgiving, slow, annd egnaging, and try to make it aws kind as possible.",
@@ -83,13 +178,11 @@ class EmotionEngine:
             "disgust":  "dissatisfied with the current explanation"
         }
 
-        latest   = emotions[-1]
-        majority = Counter(emotions).most_common(1)[0][0]
-
-        majority_count = Counter(emotions).most_common(1)[0][1]
-        min_count = max(1, len(emotions) // 3)
+        latest   = summary["latest"]
+        majority = summary["dominant"]
 
-        if majority_count < min_count:
+        # Time-decayed vote share of the majority emotion, like majority_count / len(history)
+        if len(self.history) >= 3 and summary["share"] < 1 / 3:
             return "The student's emotional state is unclear — insufficient data."
 
         if latest == majority:
@@ -103,146 +196,282 @@ class EmotionEngine:
                 f"but their expression has just shifted to {new_desc}."
             )
 
-    # -------------------------------------------------------------------------
-    # PRIVATE METHODS
-    # -------------------------------------------------------------------------
+    def _mood(self, summary):
+        if summary is None:
+            return None
+        majority = summary["dominant"]
+
+        if majority in ("angry", "sad", "fear", "disgust"):
+            return "negative"
+        if majority in ("happy", "surprise"):
+            return "positive"
+        return "neutral"
+
+    def _open_camera(self):
+        """Opens the camera at analysis resolution and low FPS, falling back to resizing if it can't."""
+        print("[EmotionEngine] Searching for USB camera...")
+        cap, camera = self.locator.open(cv2)
+        if cap is None:
+            print("[EmotionEngine] No working camera found.")
+            return False
+        print(f"[EmotionEngine] Found working camera: {camera['name']} ({camera['device']}).")
+
+        self.cap = cap
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_size[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_size[1])
+        self.cap.set(cv2.CAP_PROP_FPS, self.capture_fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        actual = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self._native_size = actual == tuple(self.frame_size)
+        self._raw = None
+        mode = "native" if self._native_size else f"resized from {actual[0]}x{actual[1]}"
+        print(f"[EmotionEngine] Capturing {self.frame_size[0]}x{self.frame_size[1]} ({mode}) at {self.cap.get(cv2.CAP_PROP_FPS):.0f} fps.")
+        return True
 
     def _frame_grabber(self):
-        """Runs at full camera speed, always keeps the latest frame."""
-        consecutive_failures = 0
-        MAX_FAILURES = 30
+        """Dequeues every frame so the driver never serves a stale one, but only decodes capture_fps of them."""
+        interval = 1.0 / self.capture_fps
+        next_decode = 0.0
 
         while self._running:
-            ret, frame = self.cap.read()
-            if ret and frame is not None:
-                with self._frame_lock:
-                    self._latest_frame = frame
-                consecutive_failures = 0
-            else:
-                consecutive_failures += 1
-                if consecutive_failures >= MAX_FAILURES:
-                    print("[EmotionEngine] Camera lost! Attempting to reconnect...")
-                    self._reconnect()
-                    consecutive_failures = 0
+            if not self._grab():
+                continue
 
-    def _reconnect(self):
-        """Release and re-open the camera if it disconnects."""
-        try:
-            if self.cap:
-                self.cap.release()
-            time.sleep(2)
-            camera_index = self._find_camera()
-            if camera_index is not None:
-                self.cap = cv2.VideoCapture(camera_index)
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                print("[EmotionEngine] Camera reconnected successfully.")
+            now = time.time()
+            if now >= next_decode and self._decode_to_back():
+                next_decode = now + interval
+
+    def _grab(self):
+        """cap.grab() with reconnect after too many consecutive failures."""
+        MAX_FAILURES = 30
+
+        if self.cap.grab():
+            self._capture_failures = 0
+            return True
+
+        self._capture_failures += 1
+        if self._capture_failures >= MAX_FAILURES:
+            print("[EmotionEngine] Camera lost! Attempting to reconnect...")
+            self._reconnect()
+            self._capture_failures = 0
+        return False
+
+    def _decode_to_back(self):
+        """Retrieves the last grabbed frame into the back buffer and swaps it to the front."""
+        with self._frame_lock:
+            back = 1 - self._front
+            if self._checked_out.get(back):
+                return False  # A reader still holds it; try again on the next frame
+
+        target = self._buffers[back]
+        ret, frame = self.cap.retrieve(target if self._native_size else self._raw)
+        if not ret or frame is None:
+            return False
+
+        if frame is not target:
+            # The camera delivered a different size than asked for (or the raw buffer was new)
+            if frame.shape == target.shape:
+                np.copyto(target, frame)
             else:
-                print("[EmotionEngine] Reconnect failed. Will retry next cycle.")
-        except Exception as e:
-            print(f"[EmotionEngine] Reconnect error: {e}")
+                self._raw = frame
+                cv2.resize(frame, self.frame_size, dst=target)
 
-    def _get_fresh_frame(self):
-        """Returns a copy of the most recently captured frame, or None."""
         with self._frame_lock:
-            return self._latest_frame.copy() if self._latest_frame is not None else None
+            self._front = back
+            self._frame_seq += 1
+        return True
+
+    def _capture_now(self):
+        """On-demand mode: flush the driver's queued frame, then decode a fresh one."""
+        with self._capture_lock:
+            for _ in range(2):
+                if not self._grab():
+                    return False
+            return self._decode_to_back()
+
+    @contextmanager
+    def _frame(self):
+        """
+        Yields (buffer index, frame) for the newest frame without copying it ((None, None)
+        if there is none yet). The grabber won't write into that buffer until every block
+        holding it exits, so don't keep a reference.
+        """
+        if self.on_demand:
+            self._capture_now()
 
-    def _find_camera(self):
-        """Scans indices 1-5, suppressing noisy OpenCV warnings during scan."""
-        print("[EmotionEngine] Searching for USB camera...")
+        with self._frame_lock:
+            index = self._front if self._frame_seq else None
+            if index is not None:
+                self._checked_out[index] = self._checked_out.get(index, 0) + 1
+        try:
+            yield index, (self._buffers[index] if index is not None else None)
+        finally:
+            if index is not None:
+                with self._frame_lock:
+                    self._checked_out[index] -= 1
 
-        # Suppress OpenCV's stderr spam during scanning
-        devnull = os.open(os.devnull, os.O_WRONLY)
-        old_stderr = os.dup(2)
-        os.dup2(devnull, 2)
-
-        found_index = None
-        for i in range(1, 6):
-            test_cap = cv2.VideoCapture(i)
-            if test_cap.isOpened():
-                ret, frame = test_cap.read()
-                if ret and frame is not None:
-                    test_cap.release()
-                    found_index = i
+    def _reconnect(self):
+        """Release the camera and re-open it as soon as a video device (re)appears."""
+        if self.cap:
+            self.cap.release()
+        self.tracker.reset()  # A replugged or moved camera sees the student somewhere else
+        while self._running:
+            try:
+                if self._open_camera():
+                    print("[EmotionEngine] Camera reconnected successfully.")
+                    return
+            except Exception as e:
+                print(f"[EmotionEngine] Reconnect error: {e}")
+            print("[EmotionEngine] Waiting for the camera to be plugged back in...")
+            # The hot-plug watcher wakes this immediately; the timeout is only a safety net
+            self.locator.wait_for_change(timeout=10)
+
+    def _analyze(self, index, frame, crop=None, **options):
+        """
+        DeepFace emotion analysis of a checked-out frame (buffer `index`), or of its
+        (x, y, w, h) crop, in the worker process when there is one. Regions come back
+        in crop coordinates.
+        """
+        if self._worker:
+            return self._worker.analyze(index, crop=crop, **options)
+
+        from deepface import DeepFace
+        if crop:
+            x, y, w, h = crop
+            frame = frame[y:y + h, x:x + w]
+        results = DeepFace.analyze(frame, actions=['emotion'], silent=True, **options)
+        return results if isinstance(results, list) else [results]
+
+    def _analyze_burst_frames(self, count, crop=None, **options):
+        """One batched analysis of the first `count` burst frames. Returns one face list per frame."""
+        if self._worker:
+            return self._worker.analyze_batch(len(self._buffers), count, crop=crop, **options)
+
+        from deepface import DeepFace
+        from core.emotion_worker import analyze_batch
+        frames = self._burst_frames[:count]
+        if crop:
+            x, y, w, h = crop
+            frames = frames[:, y:y + h, x:x + w]
+        return analyze_batch(DeepFace, frames, **options)
+
+    def _burst_loop(self):
+        """Copies distinct frames into the burst slots until stopped or full, then analyzes them together."""
+        last_seq = None
+        try:
+            while self._burst_count < self.burst_size:
+                with self._frame() as (_, frame):
+                    if frame is not None and self._frame_seq != last_seq:
+                        last_seq = self._frame_seq
+                        np.copyto(self._burst_frames[self._burst_count], frame)
+                        self._burst_count += 1
+                if self._burst_stop.wait(self.burst_spacing):
                     break
-            test_cap.release()
 
-        # Always restore stderr before returning
-        os.dup2(old_stderr, 2)
-        os.close(devnull)
-        os.close(old_stderr)
+            if self._burst_count:
+                roi = self.tracker.roi(*self.frame_size)
+                batch = self._analyze_burst_frames(self._burst_count, crop=roi, enforce_detection=False, detector_backend='yunet')
+                reading = self._fuse(batch, roi)
+                if reading:
+                    probs, confidence, face_area, frames = reading
+                    self.history.add(probs, confidence, face_area)
+                    print(f"[EmotionEngine] Burst of {frames}: {EMOTIONS[int(np.argmax(probs))]} ({confidence}%)")
 
-        if found_index is not None:
-            print(f"[EmotionEngine] Found working camera at index {found_index}.")
-        else:
-            print("[EmotionEngine] No working camera found.")
+        except Exception as e:
+            print(f"[EmotionEngine] Burst analysis error: {e}")
 
-        return found_index
+        finally:
+            self._burst_done.set()
+
+    def _fuse(self, batch, roi=None):
+        """
+        Fuses per-frame emotion probabilities into one reading, weighting each frame
+        by its model confidence and face quality (detector score and face size).
+        Returns (probs, confidence, face_area, frames) or None.
+        """
+        frame_area = self.frame_size[0] * self.frame_size[1]
+
+        total = np.zeros(len(EMOTIONS))
+        weight_sum = 0.0
+        area_sum = 0.0
+        frames = 0
+        for faces in batch:
+            face = self.tracker.select(faces, self.frame_size, roi)
+            if face is None:
+                continue
+            face_area = face['region']['w'] * face['region']['h']
+
+            probs = np.array([face['emotion'].get(e, 0.0) for e in EMOTIONS]) / 100.0
+            size_quality = min(1.0, face_area / (frame_area * 0.05))  # Faces under ~5% of the frame count less
+            weight = probs.max() * face.get('face_confidence', 1.0) * size_quality
+            total += weight * probs
+            weight_sum += weight
+            area_sum += weight * face_area
+            frames += 1
+
+        if weight_sum <= 0:
+            return None
+
+        fused = total / weight_sum
+        best = int(np.argmax(fused))
+        confidence = round(float(fused[best]) * 100, 2)
+        if confidence < MIN_CONFIDENCE:
+            print(f"[EmotionEngine] Skipped low-confidence burst: {EMOTIONS[best]} ({confidence}%)")
+            return None
+        return fused, confidence, area_sum / weight_sum, frames
 
     def _loop(self):
         """Analyzes the latest frame every scan_interval seconds."""
-        MIN_CONFIDENCE = 80.0
-
         print("[EmotionEngine] Waiting for first live frame...")
-        while self._running and self._get_fresh_frame() is None:
+        while self._running and not self.on_demand and self._frame_seq == 0:
             time.sleep(0.1)
 
-        print("[EmotionEngine] Loading DeepFace model (first time)...")
-        try:
-            warmup_frame = self._get_fresh_frame()
-            if warmup_frame is not None:
-                DeepFace.analyze(
-                    warmup_frame,
-                    actions=['emotion'],
-                    enforce_detection=False,
-                    silent=True
-                )
-        except Exception:
-            pass
+        if not self._worker:
+            print("[EmotionEngine] Loading DeepFace model (first time)...")
+            try:
+                with self._frame() as (index, warmup_frame):
+                    if warmup_frame is not None:
+                        self._analyze(index, warmup_frame, enforce_detection=False)
+            except Exception:
+                pass
         print("[EmotionEngine] Model loaded. Now scanning in real time.")
 
         while self._running:
+            # A burst is covering this utterance; don't compete with it for the camera and model
+            self._burst_done.wait()
             try:
-                frame = self._get_fresh_frame()
-
-                if frame is None:
-                    time.sleep(0.5)
-                    continue
-
-                # Resize 640x480 → 320x240 for faster DeepFace processing
-                small_frame = cv2.resize(frame, (320, 240))
-
-                results = DeepFace.analyze(
-                    small_frame,
-                    actions=['emotion'],
-                    enforce_detection=False,
-                    detector_backend='yunet',  # More sensitive than default opencv
-                    silent=True
-                )
-
-                result = results[0] if isinstance(results, list) else results
-
-                face_w = result['region']['w']
-                face_h = result['region']['h']
-                frame_area = small_frame.shape[0] * small_frame.shape[1]  # 76800
-                face_area  = face_w * face_h
-
-                # Reject readings with no real face detected
-                if face_area == 0 or face_area > (frame_area * 0.90) or face_area < 100:
-                    print(f"[EmotionEngine] No real face detected (region {face_w}x{face_h}). Skipping. \n Fail Count: {self.fail_count}")
+                # Frames already arrive at analysis size (320x240), so no resize or copy here
+                with self._frame() as (index, frame):
+                    if frame is None:
+                        time.sleep(0.5)
+                        continue
+
+                    # Detection runs on a padded crop around the student while tracking holds
+                    roi = self.tracker.roi(frame.shape[1], frame.shape[0])
+                    results = self._analyze(
+                        index,
+                        frame,
+                        crop=roi,
+                        enforce_detection=False,
+                        detector_backend='yunet'  # More sensitive than default opencv
+                    )
+
+                # Picks the student's face and rejects readings with no real face detected
+                result = self.tracker.select(results, self.frame_size, roi)
+
+                if result is None:
+                    where = "in tracked region" if roi else "in frame"
+                    print(f"[EmotionEngine] No real face detected {where}. Skipping. \n Fail Count: {self.fail_count}")
                     self.fail_count += 1
-
-                    if self.fail_count >= 10: 
-                        time.sleep(15)
-                    elif self.fail_count >= 5:
-                        time.sleep(7)
-                    else:
-                        time.sleep(self.scan_interval)
-                    
+                    self.scheduler.record_scan(face_found=False)
+                    self._wait_for_next_scan()
                     continue
 
-                else: self.fail_count = 0
+                else:
+                    self.fail_count = 0
+                    self.scheduler.record_scan(face_found=True)
+                    face_area = result['region']['w'] * result['region']['h']
 
                 emotion    = result['dominant_emotion']
                 confidence = round(result['emotion'][emotion], 2)
@@ -250,13 +479,9 @@ class EmotionEngine:
                 
 
                 if confidence >= MIN_CONFIDENCE:
-                    reading = {
-                        "timestamp": time.time(),
-                        "emotion": emotion,
-                        "confidence": confidence
-                    }
-                    with self._lock:
-                        self.history.append(reading)
+                    # Keep the whole probability vector, not just the winner
+                    probs = np.array([result['emotion'].get(e, 0.0) for e in EMOTIONS]) / 100.0
+                    self.history.add(probs, confidence, face_area)
                     print(f"[EmotionEngine] Detected: {emotion} ({confidence}%)")
                 else:
                     print(f"[EmotionEngine] Skipped low-confidence reading: {emotion} ({confidence}%)")
@@ -264,4 +489,9 @@ class EmotionEngine:
             except Exception as e:
                 print(f"[EmotionEngine] Analysis error: {e}")
 
-            time.sleep(self.scan_interval)
+            self._wait_for_next_scan()
+
+    def _wait_for_next_scan(self):
+        """Sleeps for the scheduler's interval, cut short by set_activity() moving to a denser state."""
+        self._wake.wait(self.scheduler.next_interval())
+        self._wake.clear()
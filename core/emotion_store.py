@@ -0,0 +1,150 @@
+import math
+import os
+import threading
+import time
+import numpy as np
+
+EMOTIONS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+READING = np.dtype([
+    ("timestamp", "<f8"),
+    ("probs", "<f4", (len(EMOTIONS),)),  # 0-1 per emotion, DeepFace order above
+    ("confidence", "<f4"),               # 0-100, probability of the dominant emotion
+    ("face_area", "<f4"),                # Pixels at analysis resolution
+])
+
+
+class EmotionStore:
+    """
+    Emotion readings for EmotionEngine.
+
+    Recent readings sit in a fixed-size numpy ring buffer. Exponentially
+    time-decayed aggregates (probabilities, and votes for each reading's dominant
+    emotion) are updated on every insert, so summaries are O(1). Every reading
+    is also appended to a session file that timeline() memory-maps, so a whole
+    session can be analysed without holding it in Python objects. Only the newest
+    `keep_sessions` session files are kept, so a kiosk running for weeks doesn't
+    fill its SD card.
+    """
+
+    def __init__(self, capacity=10, half_life=30.0, session_dir="cache/emotions", keep_sessions=20):
+        self.capacity = capacity
+        self.half_life = half_life
+
+        self._lock = threading.Lock()
+        self._ring = np.zeros(capacity, dtype=READING)
+        self._count = 0  # Total readings ever added; the ring holds the last `capacity`
+
+        # Decayed sums, all expressed as of self._updated
+        self._updated = None
+        self._probs = np.zeros(len(EMOTIONS))
+        self._votes = np.zeros(len(EMOTIONS))
+        self._weight = 0.0
+
+        self.session_path = None
+        self._session = None
+        if session_dir:
+            os.makedirs(session_dir, exist_ok=True)
+            self._prune_sessions(session_dir, keep_sessions - 1)  # Room for the one opened below
+            self.session_path = os.path.join(session_dir, time.strftime("session-%Y%m%d-%H%M%S.emo"))
+            self._session = open(self.session_path, "ab")
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def add(self, probs, confidence, face_area, timestamp=None):
+        record = np.zeros(1, dtype=READING)
+        record["timestamp"] = timestamp or time.time()
+        record["probs"] = probs
+        record["confidence"] = confidence
+        record["face_area"] = face_area
+        t = float(record["timestamp"][0])
+
+        with self._lock:
+            self._ring[self._count % self.capacity] = record[0]
+            self._count += 1
+
+            # Bring the sums up to t, then add this reading weighted by its confidence
+            decay = self._decay(t)
+            weight = confidence / 100.0
+            self._probs = self._probs * decay + weight * record["probs"][0]
+            self._votes *= decay
+            self._votes[int(np.argmax(record["probs"][0]))] += weight
+            self._weight = self._weight * decay + weight
+            self._updated = t
+
+            if self._session:
+                self._session.write(record.tobytes())
+                self._session.flush()
+
+    def latest(self):
+        """The newest reading (a numpy record), or None."""
+        with self._lock:
+            if not self._count:
+                return None
+            return self._ring[(self._count - 1) % self.capacity].copy()
+
+    def recent(self):
+        """Readings still in the ring, oldest first."""
+        with self._lock:
+            n = min(self._count, self.capacity)
+            start = self._count - n
+            return np.take(self._ring, np.arange(start, self._count) % self.capacity)
+
+    def summary(self, now=None, stale_after=30.0):
+        """
+        Decayed view of the session so far, or None if empty or the newest reading is
+        older than `stale_after` seconds. Keys: latest and dominant emotion names, the
+        dominant emotion's share of decayed votes, and the decayed probability vector.
+        """
+        now = now or time.time()
+        with self._lock:
+            if not self._count or now - self._updated > stale_after:
+                return None
+            latest = self._ring[(self._count - 1) % self.capacity]
+            votes = self._votes
+            probs = self._probs / self._weight if self._weight else self._probs
+
+        dominant = int(np.argmax(votes))
+        return {
+            "latest": EMOTIONS[int(np.argmax(latest["probs"]))],
+            "dominant": EMOTIONS[dominant],
+            "share": float(votes[dominant] / votes.sum()) if votes.sum() else 0.0,
+            "probs": dict(zip(EMOTIONS, probs.round(3).tolist())),
+        }
+
+    def timeline(self, start=None, end=None):
+        """Memory-mapped readings of this session between two timestamps (both optional)."""
+        return self.load_timeline(self.session_path, start, end) if self.session_path else np.zeros(0, dtype=READING)
+
+    @staticmethod
+    def load_timeline(path, start=None, end=None):
+        """Memory-maps any session file. Timestamps are append-ordered, so slicing is a binary search."""
+        count = os.path.getsize(path) // READING.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=READING)
+        readings = np.memmap(path, dtype=READING, mode="r", shape=(count,))
+        lo = np.searchsorted(readings["timestamp"], start) if start is not None else 0
+        hi = np.searchsorted(readings["timestamp"], end, side="right") if end is not None else count
+        return readings[lo:hi]
+
+    def close(self):
+        with self._lock:
+            if self._session:
+                self._session.close()
+                self._session = None
+
+    @staticmethod
+    def _prune_sessions(session_dir, keep):
+        # Names embed the start time, so sorting them sorts by age
+        sessions = sorted(f for f in os.listdir(session_dir) if f.startswith("session-") and f.endswith(".emo"))
+        for name in sessions[:max(0, len(sessions) - keep)]:
+            try:
+                os.remove(os.path.join(session_dir, name))
+            except OSError as e:
+                print(f"[EmotionStore] Could not remove old session {name}: {e}")
+
+    def _decay(self, t):
+        if self._updated is None:
+            return 0.0
+        return math.exp(-max(0.0, t - self._updated) * math.log(2) / self.half_life)
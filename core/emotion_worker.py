@@ -0,0 +1,103 @@
+from multiprocessing import shared_memory
+from utils.shm_worker import SharedMemoryWorker
+import numpy as np
+
+
+def _plain(value):
+    """DeepFace results hold numpy scalars; turn them into plain Python before pickling."""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def analyze_batch(DeepFace, frames, **options):
+    """
+    One batched DeepFace call over an (N, H, W, 3) array, falling back to per-frame
+    calls on DeepFace versions without batch input. Returns one face list per frame.
+    """
+    try:
+        results = DeepFace.analyze(frames, actions=['emotion'], silent=True, **options)
+        if len(frames) == 1 and results and isinstance(results[0], dict):
+            results = [results]
+    except (ValueError, TypeError, AttributeError):
+        results = [DeepFace.analyze(frame, actions=['emotion'], silent=True, **options) for frame in frames]
+    return [r if isinstance(r, list) else [r] for r in results]
+
+
+def _worker_main(shm_name, shape, slots, requests, results):
+    """Child process: keeps DeepFace/TensorFlow warm and analyzes frames placed in shared memory."""
+    from deepface import DeepFace
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+
+    # First call builds the model; do it before reporting ready
+    try:
+        DeepFace.analyze(np.zeros(shape, dtype=np.uint8), actions=['emotion'], enforce_detection=False, silent=True)
+    except Exception:
+        pass
+    results.put(("ready", None))
+
+    try:
+        while True:
+            job = requests.get()
+            if job is None:
+                break
+
+            job_id, slot, count, crop, options = job
+            try:
+                # Crops are views into shared memory, so a face ROI costs no copy either
+                x, y, w, h = crop or (0, 0, shape[1], shape[0])
+                if count is None:
+                    analysis = DeepFace.analyze(frames[slot, y:y + h, x:x + w], actions=['emotion'], silent=True, **options)
+                    analysis = analysis if isinstance(analysis, list) else [analysis]
+                else:
+                    analysis = analyze_batch(DeepFace, frames[slot:slot + count, y:y + h, x:x + w], **options)
+                results.put((job_id, _plain(analysis)))
+            except Exception as e:
+                results.put((job_id, e))
+    finally:
+        del frames
+        shm.close()
+
+
+class EmotionWorker:
+    """
+    DeepFace in its own supervised process, so TensorFlow's memory and any crash
+    stay out of the tutor's process and off its GIL. The worker owns `slots`
+    frame buffers in shared memory; EmotionEngine captures straight into them
+    (see `frames`) and analyze() only sends the slot number. A worker that dies
+    or stops answering within `timeout` seconds is killed and restarted.
+    """
+
+    def __init__(self, frame_size=(320, 240), slots=2, timeout=10.0):
+        self.shape = (frame_size[1], frame_size[0], 3)
+        self.slots = slots
+        self._worker = SharedMemoryWorker(
+            "EmotionWorker", _worker_main, (self.shape, slots),
+            shm_size=slots * int(np.prod(self.shape)), timeout=timeout
+        )
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self._worker.shm.buf)
+
+    @property
+    def restarts(self):
+        return self._worker.restarts
+
+    def analyze(self, slot, crop=None, **options):
+        """
+        Runs DeepFace emotion analysis on frames[slot], or on its (x, y, w, h) `crop`.
+        Returns DeepFace's list of face results, in crop coordinates.
+        """
+        return self._worker.call(slot, None, crop, options)
+
+    def analyze_batch(self, start, count, crop=None, **options):
+        """Analyzes frames[start:start + count] (optionally cropped) in one batched call. Returns one face list per frame."""
+        return self._worker.call(start, count, crop, options)
+
+    def stop(self):
+        del self.frames
+        self._worker.stop()
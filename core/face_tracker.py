@@ -0,0 +1,126 @@
+import threading
+
+
+class FaceTracker:
+    """
+    Follows the student's face between emotion scans.
+
+    While tracking confidence is high, roi() returns a padded box around the
+    last known face so the next scan only runs detection on that crop; when it
+    drops (the face wasn't found in the crop), the next scan goes back to the
+    full frame. select() picks the student from DeepFace's face list: the face
+    overlapping the tracked one, or when (re)acquiring, the largest and most
+    central face, since the student sits right in front of Nova. The scan loop and
+    burst thread share one tracker, so the public methods hold a lock.
+    """
+
+    def __init__(self, pad=0.6, min_confidence=0.4, smoothing=0.5, miss_decay=0.5, min_overlap=0.2):
+        self.pad = pad                        # ROI margin, as a fraction of the face size on each side
+        self.min_confidence = min_confidence  # Below this, scans use the full frame
+        self.smoothing = smoothing
+        self.miss_decay = miss_decay
+        self.min_overlap = min_overlap
+
+        self.box = None  # (x, y, w, h) in full-frame pixels
+        self.confidence = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def tracking(self):
+        return self.box is not None and self.confidence >= self.min_confidence
+
+    def roi(self, frame_w, frame_h):
+        """Padded (x, y, w, h) crop around the tracked face, or None for a full-frame scan."""
+        with self._lock:
+            if not self.tracking:
+                return None
+            x, y, w, h = self.box
+        x0 = max(0, int(x - w * self.pad))
+        y0 = max(0, int(y - h * self.pad))
+        x1 = min(frame_w, int(x + w * (1 + self.pad)))
+        y1 = min(frame_h, int(y + h * (1 + self.pad)))
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def select(self, faces, frame_size, roi=None):
+        """
+        Returns the student's face from DeepFace results for the analyzed image (the ROI
+        if given), with its region moved to full-frame coordinates, or None. Updates the track.
+        """
+        with self._lock:
+            return self._select(faces, frame_size, roi)
+
+    def _select(self, faces, frame_size, roi):
+        frame_w, frame_h = frame_size
+        ox, oy = (roi[0], roi[1]) if roi else (0, 0)
+        image_area = roi[2] * roi[3] if roi else frame_w * frame_h
+
+        candidates = []
+        for face in faces:
+            region = face['region']
+            area = region['w'] * region['h']
+            # DeepFace returns the whole image as the "face" when nothing was detected
+            if area == 0 or area > image_area * 0.90 or area < 100:
+                continue
+            box = (region['x'] + ox, region['y'] + oy, region['w'], region['h'])
+            candidates.append((box, face))
+
+        if not candidates:
+            self._miss()
+            return None
+
+        if self.box is not None:
+            overlaps = [(_iou(self.box, box), box, face) for box, face in candidates]
+            overlap, box, face = max(overlaps, key=lambda o: o[0])
+            if overlap >= self.min_overlap:
+                self._update(box, overlap)
+                return _moved(face, box)
+            if self.tracking:
+                # Faces, but none where the student was: likely a bystander, so don't jump to them
+                self._miss()
+                return None
+
+        # (Re)acquire: prefer large faces near the centre of the frame
+        def score(candidate):
+            (x, y, w, h), _ = candidate
+            dx = (x + w / 2) / frame_w - 0.5
+            dy = (y + h / 2) / frame_h - 0.5
+            return w * h * (1.0 - min(0.9, (dx * dx + dy * dy) ** 0.5))
+
+        box, face = max(candidates, key=score)
+        self.box = None
+        self._update(box, 1.0)
+        return _moved(face, box)
+
+    def reset(self):
+        with self._lock:
+            self.box = None
+            self.confidence = 0.0
+
+    def _update(self, box, quality):
+        if self.box is None:
+            self.box = box
+        else:
+            a = self.smoothing
+            self.box = tuple(a * old + (1 - a) * new for old, new in zip(self.box, box))
+        # Overlap of 0.5 or more with the previous box counts as a perfect match
+        self.confidence = 0.5 * self.confidence + 0.5 * min(1.0, quality / 0.5)
+
+    def _miss(self):
+        self.confidence *= self.miss_decay
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0.0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0.0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _moved(face, box):
+    """Copy of a DeepFace face result with its region in full-frame coordinates."""
+    face = dict(face)
+    face['region'] = dict(face['region'], x=int(box[0]), y=int(box[1]))
+    return face
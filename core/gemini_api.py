@@ -1,4 +1,7 @@
 import google.generativeai as genai
+from core.conversation_memory import ConversationMemory
+from core.prompts import build_prompt
+from core.llm_clients import GeminiClient, ResilientLLM, Filler
 
 instruction = """You are Nova, an advanced AI tutor built into a physical tutoring robot. You have a camera that analyzes the student's facial expressions in real time. When behavioral sensor data is provided in a prompt, use it silently to adapt your teaching style — never announce that you are doing so.
 
@@ -29,18 +32,47 @@ Name your boxes clearly so you always know what is inside.
 !!! YOU ARE IN DEBUG MODE: THIS MEANS WHEN ASKED ABOUT EMOTION, PLEASE SAY THE EXACT INTERPRETAION OF THE EMOTIONAL STATE YOU STORED ON THE STUDENT !!!
 """
 class AIAgent:
-    def __init__(self, api_key):
+    def __init__(self, api_key, client=None, ttft_deadline=4.5, chunk_deadline=5.0):
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(
             model_name="gemini-2.5-flash",
             #gemini-1.5-flash
             #gemini-2.5-flash
             system_instruction= instruction)
-        self.chat = self.model.start_chat(history=[])
+
+        # Deadlines, retries and filler phrases around the raw stream (see core/llm_clients.py)
+        self.llm = ResilientLLM(client or GeminiClient(self.model), ttft_deadline=ttft_deadline, chunk_deadline=chunk_deadline)
+
+        # Bounded history; old turns are folded into a summary by a plain (persona-free) model
+        self.memory = ConversationMemory(genai.GenerativeModel(model_name="gemini-2.5-flash"))
+
+    def stream_reply(self, user_text, emotion_context=None, remember=True):
+        """
+        Streams Nova's reply as text chunks. The chat is rebuilt from the bounded memory
+        before each request, and the turn is only remembered if the stream completes.
+        Speculative requests pass remember=False and call remember() once committed.
+        """
+        response = self.llm.stream(self.memory.build_history(), build_prompt(user_text, emotion_context))
+
+        reply = ""
+        for text_chunk in response:
+            if not isinstance(text_chunk, Filler):
+                reply += text_chunk
+            yield text_chunk
+
+        if remember:
+            self.remember(user_text, reply)
+
+    def replay(self, user_text, reply):
+        """Yields a locally cached reply and remembers the turn as if Gemini had said it."""
+        yield reply
+        self.remember(user_text, reply)
+
+    def remember(self, user_text, reply):
+        self.memory.add_turn(user_text, reply)
 
     def generate_response(self, prompt):
+        """One-off streamed completion with no chat history."""
         print('Sending reponse to Gemini')
-        response = self.model.send_message(prompt, stream=True)
-        for chunk in response:
-            if chunk.text:
-                yield chunk.text
\ No newline at end of file
+        for chunk in self.llm.stream([], prompt):
+            yield chunk
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+LLM client layer for AIAgent.
+
+A client streams text for (history, prompt). GeminiClient talks to the real API,
+MockLLMClient replays scripted latencies offline, and ResilientLLM wraps either
+with time-to-first-token and inter-chunk deadlines, bounded retries and filler
+phrases, so a stalled stream can never leave Nova stuck in the speaking state.
+
+    python -m core.llm_clients --ttft 2.5 --stall-after 3
+"""
+from abc import ABC, abstractmethod
+import argparse
+import queue
+import threading
+import time
+
+RESUME_PROMPT = "Your last reply was cut off. Continue exactly where you stopped, without repeating anything."
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+class Filler(str):
+    """Text spoken to cover a delay or failure. Shown and spoken, but never remembered as part of the reply."""
+
+
+class LLMClient(ABC):
+    """Interface for a streaming chat model. stream() yields text chunks and raises on failure."""
+
+    name = "base"
+
+    @abstractmethod
+    def stream(self, history, prompt):
+        pass
+
+
+class GeminiClient(LLMClient):
+    name = "gemini"
+
+    def __init__(self, model, request_timeout=30):
+        self.model = model  # genai.GenerativeModel, system instruction already set
+        self.request_timeout = request_timeout
+
+    def stream(self, history, prompt):
+        chat = self.model.start_chat(history=history)
+        response = chat.send_message(prompt, stream=True, request_options={"timeout": self.request_timeout})
+        for chunk in response:
+            try:
+                text_chunk = chunk.text
+            except ValueError:
+                continue
+            if text_chunk:
+                yield text_chunk
+
+
+class MockLLMClient(LLMClient):
+    """
+    Offline stand-in with scripted latencies, for tests and benchmarking.
+
+    Each call takes the next entry of `script` (falling back to the defaults once it
+    runs out). An entry may override ttft, chunk_delay, fail_after (raise after that
+    many chunks) and stall_after (hang after that many chunks).
+    """
+
+    name = "mock"
+
+    def __init__(self, reply="Recursion is when a function **calls itself** on a smaller piece of the problem. "
+                             "Each call waits for the one below it, until a base case stops the chain.",
+                 ttft=0.4, chunk_delay=0.05, chunk_words=4, script=None):
+        self.reply = reply
+        self.defaults = {"ttft": ttft, "chunk_delay": chunk_delay, "fail_after": None, "stall_after": None}
+        self.chunk_words = chunk_words
+        self.script = list(script or [])
+        self.requests = []
+
+    def stream(self, history, prompt):
+        step = dict(self.defaults)
+        if len(self.requests) < len(self.script):
+            step.update(self.script[len(self.requests)])
+        self.requests.append({"history": history, "prompt": prompt})
+
+        words = self.reply.split(" ")
+        chunks = [" ".join(words[i:i + self.chunk_words]) + " " for i in range(0, len(words), self.chunk_words)]
+
+        time.sleep(step["ttft"])
+        for i, chunk in enumerate(chunks):
+            if step["fail_after"] is not None and i >= step["fail_after"]:
+                raise LLMError("mock failure")
+            if step["stall_after"] is not None and i >= step["stall_after"]:
+                time.sleep(3600)
+            if i:
+                time.sleep(step["chunk_delay"])
+            yield chunk
+
+
+_DONE = object()
+
+
+class ResilientLLM(LLMClient):
+    """
+    Wraps a client with deadlines and retries.
+
+    The first chunk must arrive within `ttft_deadline` seconds and each later one
+    within `chunk_deadline`. When the first-token deadline passes, a filler phrase
+    is yielded once so Nova isn't silent while waiting. A stream that fails or
+    stalls is retried up to `retries` times; if it had already produced text, the
+    retry asks the model to continue from that text instead of starting over. If
+    every attempt fails, an apology is yielded and LLMError is raised.
+    """
+
+    name = "resilient"
+
+    def __init__(self, client, ttft_deadline=4.5, chunk_deadline=5.0, retries=2,
+                 filler="Hmm, let me think about that for a second.\n\n",
+                 apology="Sorry, I lost my train of thought there - could you ask me that again?\n\n"):
+        self.client = client
+        self.ttft_deadline = ttft_deadline
+        self.chunk_deadline = chunk_deadline
+        self.retries = retries
+        self.filler = filler
+        self.apology = apology
+
+    def stream(self, history, prompt):
+        reply = ""
+        filler_sent = False
+
+        for attempt in range(self.retries + 1):
+            if reply:
+                # Resume: the partial answer becomes a model turn and the model is asked to carry on
+                attempt_history = history + [
+                    {"role": "user", "parts": [prompt]},
+                    {"role": "model", "parts": [reply]},
+                ]
+                attempt_prompt = RESUME_PROMPT
+            else:
+                attempt_history, attempt_prompt = history, prompt
+
+            chunks, cancel = self._start(attempt_history, attempt_prompt)
+            started = time.time()
+            got_chunk = False
+            try:
+                while True:
+                    if got_chunk:
+                        timeout = self.chunk_deadline
+                    elif not filler_sent and self.filler:
+                        timeout = max(0.0, started + self.ttft_deadline - time.time())
+                    else:
+                        # Filler already covers the wait; allow one more deadline before giving up
+                        timeout = max(0.0, started + 2 * self.ttft_deadline - time.time())
+
+                    try:
+                        item = chunks.get(timeout=timeout)
+                    except queue.Empty:
+                        if not got_chunk and not filler_sent and self.filler:
+                            print(f"[LLM] No first token after {self.ttft_deadline:.1f}s, speaking filler")
+                            filler_sent = True
+                            yield Filler(self.filler)
+                            continue
+                        raise LLMError(f"{self.client.name} stalled ({'between chunks' if got_chunk else 'before first token'})")
+
+                    if item is _DONE:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    got_chunk = True
+                    reply += item
+                    yield item
+
+            except Exception as e:
+                print(f"[LLM] Attempt {attempt + 1}/{self.retries + 1} failed: {e}")
+
+            finally:
+                cancel.set()
+
+        yield Filler(self.apology)
+        raise LLMError(f"{self.client.name} failed after {self.retries + 1} attempts")
+
+    def _start(self, history, prompt):
+        """Runs the client stream on a pump thread so it can be abandoned when a deadline passes."""
+        chunks = queue.Queue()
+        cancel = threading.Event()
+
+        def pump():
+            stream = self.client.stream(history, prompt)
+            try:
+                for chunk in stream:
+                    if cancel.is_set():
+                        return
+                    chunks.put(chunk)
+                chunks.put(_DONE)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                stream.close()
+
+        threading.Thread(target=pump, daemon=True).start()
+        return chunks, cancel
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run ResilientLLM against the mock client and time it.")
+    parser.add_argument("--ttft", type=float, default=0.4)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--fail-after", type=int, default=None, help="First attempt fails after N chunks")
+    parser.add_argument("--stall-after", type=int, default=None, help="First attempt hangs after N chunks")
+    parser.add_argument("--ttft-deadline", type=float, default=2.0)
+    parser.add_argument("--chunk-deadline", type=float, default=1.0)
+    args = parser.parse_args()
+
+    mock = MockLLMClient(ttft=args.ttft, chunk_delay=args.chunk_delay,
+                         script=[{"fail_after": args.fail_after, "stall_after": args.stall_after}])
+    llm = ResilientLLM(mock, ttft_deadline=args.ttft_deadline, chunk_deadline=args.chunk_deadline)
+
+    start = time.time()
+    first = None
+    try:
+        for chunk in llm.stream([], "What is recursion?"):
+            first = first or time.time() - start
+            label = "filler" if isinstance(chunk, Filler) else "chunk"
+            print(f"{time.time() - start:6.2f}s  {label:<6} {chunk!r}")
+    except LLMError as e:
+        print(f"Gave up: {e}")
+    print(f"First output {first:.2f}s, total {time.time() - start:.2f}s, {len(mock.requests)} request(s)")
@@ -1,11 +1,6 @@
 # prompts.py
 
-SYSTEM_PERSONA = """You are Nova, a warm, encouraging, and adaptive AI tutor built into a physical tutoring robot. 
-You are speaking OUT LOUD to a student sitting in front of you, so keep responses conversational and concise.
-Never use markdown formatting like ** or bullet points — speak in plain sentences only.
-Never say you "can't see" or "don't have access to" the student. You have a camera and behavioral analysis system.
-"""
-
+# The persona lives in gemini_api.instruction (system_instruction), so it is not repeated here.
 def build_prompt(user_text, emotion_context=None):
     if emotion_context:
         context_block = f"""[BEHAVIORAL SENSOR DATA]
@@ -16,9 +11,7 @@ If they are engaged and happy, match their energy. If they ask what emotion they
     else:
         context_block = ""
 
-    return f"""{SYSTEM_PERSONA}
-
-{context_block}
+    return f"""{context_block}
 
 Student says: "{user_text}"
 
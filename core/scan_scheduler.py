@@ -0,0 +1,124 @@
+import threading
+
+THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
+# Raspberry Pi firmware throttle flags (same bits as `vcgencmd get_throttled`)
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+THROTTLE_NOW = 0x1 | 0x2 | 0x4 | 0x8  # Under-voltage, frequency capped, throttled, soft temperature limit
+
+
+class ScanScheduler:
+    """
+    Decides how long EmotionEngine waits between scans.
+
+    The base rate follows Nova's UI state: dense while the student is talking
+    or the question is being processed (that's when get_context() is read),
+    sparse while Nova speaks or sits idle. It is then stretched when the SoC
+    is hot or throttling, when the CPU is busy, and after repeated scans with
+    no face in view.
+    """
+
+    def __init__(self, scan_interval=3, dense_interval=1.0, max_interval=20.0,
+                 temp_soft=65.0, temp_hard=80.0, load_soft=0.7,
+                 thermal_path=THERMAL_PATH, throttled_path=THROTTLED_PATH):
+        self.intervals = {
+            "listening": dense_interval,
+            "processing": dense_interval,
+            "speaking": scan_interval * 2,
+            "idle": scan_interval * 2,
+        }
+        self.scan_interval = scan_interval  # Used before the first state change
+        self.max_interval = max_interval
+        self.temp_soft = temp_soft
+        self.temp_hard = temp_hard
+        self.load_soft = load_soft
+        self.thermal_path = thermal_path
+        self.throttled_path = throttled_path
+
+        self.state = None
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._last_cpu = None
+
+    def set_state(self, state):
+        """Returns True when the new state wants denser scanning than the old one."""
+        with self._lock:
+            old = self.intervals.get(self.state, self.scan_interval)
+            self.state = state
+            return self.intervals.get(state, self.scan_interval) < old
+
+    def record_scan(self, face_found):
+        with self._lock:
+            self.misses = 0 if face_found else self.misses + 1
+
+    def next_interval(self):
+        with self._lock:
+            interval = self.intervals.get(self.state, self.scan_interval)
+            misses = self.misses
+
+        # No face for a while: the student probably stepped away
+        if misses >= 10:
+            interval *= 4
+        elif misses >= 5:
+            interval *= 2
+
+        interval *= self._thermal_factor()
+
+        load = self.cpu_load()
+        if load is not None and load > self.load_soft:
+            interval *= 1 + 2 * (load - self.load_soft) / (1 - self.load_soft)
+
+        return min(interval, self.max_interval)
+
+    def status(self):
+        return {
+            "state": self.state,
+            "temperature": self.temperature(),
+            "throttled": self.throttled(),
+            "misses": self.misses,
+        }
+
+    # -------------------------------------------------------------------------
+    # SENSORS
+    # -------------------------------------------------------------------------
+
+    def temperature(self):
+        """SoC temperature in °C, or None where sysfs doesn't expose it."""
+        try:
+            with open(self.thermal_path) as f:
+                return int(f.read().strip()) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+    def throttled(self):
+        """True while the firmware reports active throttling or under-voltage."""
+        try:
+            with open(self.throttled_path) as f:
+                return bool(int(f.read().strip(), 16) & THROTTLE_NOW)
+        except (OSError, ValueError):
+            return False
+
+    def cpu_load(self):
+        """Fraction of CPU time busy since the previous call, from /proc/stat."""
+        try:
+            with open("/proc/stat") as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        total = sum(fields)
+        with self._lock:
+            last, self._last_cpu = self._last_cpu, (idle, total)
+        if last is None or total == last[1]:
+            return None
+        return 1.0 - (idle - last[0]) / (total - last[1])
+
+    def _thermal_factor(self):
+        if self.throttled():
+            return 4.0
+        temp = self.temperature()
+        if temp is None or temp <= self.temp_soft:
+            return 1.0
+        if temp >= self.temp_hard:
+            return 4.0
+        return 1.0 + 3.0 * (temp - self.temp_soft) / (self.temp_hard - self.temp_soft)
@@ -0,0 +1,155 @@
+import queue
+import re
+import threading
+import time
+
+_DONE = object()
+
+
+def normalize_transcript(text):
+    """Lowercase words only, so punctuation and casing differences between decodes still match."""
+    return " ".join(re.findall(r"[a-z0-9']+", text.lower()))
+
+
+class _Speculation:
+    """One early Gemini request, buffered on a pump thread until the final transcript decides its fate."""
+
+    def __init__(self, text, stream):
+        self.text = text
+        self.key = normalize_transcript(text)
+        self.started = time.time()
+        self.first_chunk_at = None  # When Gemini's first chunk arrived, if it has
+        self.cancelled = False
+        self._chunks = queue.Queue()
+        threading.Thread(target=self._pump, args=(stream,), daemon=True).start()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __iter__(self):
+        while True:
+            item = self._chunks.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _pump(self, stream):
+        try:
+            for chunk in stream:
+                if self.cancelled:
+                    break
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.time()
+                self._chunks.put(chunk)
+        except Exception as e:
+            self._chunks.put(e)
+        finally:
+            stream.close()
+            self._chunks.put(_DONE)
+
+
+class SpeculativeLLM:
+    """
+    Starts Nova's reply before the student has officially finished talking.
+
+    SpeechListener calls speculate() with its likely final transcript during the
+    end-of-speech silence. The Gemini request is fired right away and buffered.
+    When the real transcript arrives, resolve() hands over the already-running
+    stream if the two match (a hit), or cancels it so the caller re-issues (a miss).
+    Speculative streams never touch the chat memory until they are committed.
+    """
+
+    def __init__(self, bot, get_emotion_context=lambda: None, enabled=True):
+        self.bot = bot
+        self.get_emotion_context = get_emotion_context
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0  # Turns where no speculation had been fired
+        self.time_saved = 0.0  # Sum over hits of first-token latency taken off the critical path
+
+        self._lock = threading.Lock()
+        self._current = None
+
+    def speculate(self, text):
+        """Fires an early request for `text`. Safe to call from any thread; repeats of the same text are ignored."""
+        if not self.enabled:
+            return
+        key = normalize_transcript(text)
+        with self._lock:
+            if self._current and self._current.key == key:
+                return
+        # Outside the lock, so resolve() is never stuck behind it
+        emotion_context = self.get_emotion_context()
+        with self._lock:
+            if self._current and self._current.key == key:
+                return
+            if self._current:
+                self._current.cancel()
+            print(f"[Speculation] Early request for '{text}'")
+            stream = self.bot.stream_reply(text, emotion_context, remember=False)
+            self._current = _Speculation(text, stream)
+
+    def resolve(self, final_text):
+        """
+        Returns the speculative reply stream if it was made for `final_text`, else None.
+        Either way the pending speculation is consumed.
+        """
+        with self._lock:
+            current, self._current = self._current, None
+
+        if current is None:
+            self.skipped += 1
+            return None
+
+        if current.key != normalize_transcript(final_text):
+            current.cancel()
+            self.misses += 1
+            print(f"[Speculation] Miss: heard '{final_text}', speculated '{current.text}'")
+            self._report()
+            return None
+
+        # A fresh request would wait the same time to first token, but only from now. The part
+        # already spent is saved, up to the first chunk (after that the reply waits on us, not Gemini)
+        now = time.time()
+        saved = min(current.first_chunk_at or now, now) - current.started
+        self.hits += 1
+        self.time_saved += saved
+        print(f"[Speculation] Hit, first token {saved * 1000:.0f} ms sooner")
+        self._report()
+        return self._commit(final_text, current)
+
+    def cancel(self):
+        with self._lock:
+            current, self._current = self._current, None
+        if current:
+            current.cancel()
+
+    def stats(self):
+        attempts = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": self.hits / attempts if attempts else None,
+            "avg_saved": self.time_saved / self.hits if self.hits else None,
+        }
+
+    def _commit(self, user_text, speculation):
+        reply = ""
+        try:
+            for chunk in speculation:
+                reply += chunk
+                yield chunk
+        finally:
+            speculation.cancel()  # Stops the pump if the consumer gave up early
+        self.bot.remember(user_text, reply)
+
+    def _report(self):
+        stats = self.stats()
+        saved = f"{stats['avg_saved'] * 1000:.0f} ms" if stats["avg_saved"] is not None else "-"
+        print(f"[Speculation] {self.hits} hits / {self.misses} misses / {self.skipped} skipped, "
+              f"hit rate {stats['hit_rate']:.0%}, avg saved {saved}")
@@ -0,0 +1,102 @@
+import threading
+import time
+
+
+class StartupOrchestrator:
+    """
+    Brings Nova's components up concurrently.
+
+    Each component is a factory plus the names of the components it needs. A component's
+    thread starts as soon as all of its dependencies are ready, and receives their values
+    as positional arguments. Heavy modules should be imported inside the factory so they
+    load in parallel instead of at the top of main.py.
+    """
+
+    def __init__(self):
+        self._components = {}
+        self._order = []
+        self._boot_time = None
+
+    def add(self, name, factory, deps=(), optional=False):
+        """Declares a component. Optional components may fail without failing the boot."""
+        self._components[name] = {
+            "factory": factory,
+            "deps": list(deps),
+            "optional": optional,
+            "ready": threading.Event(),
+            "value": None,
+            "error": None,
+            "started": None,
+            "finished": None,
+        }
+        self._order.append(name)
+
+    def start(self):
+        """Launches every component in declaration order; returns immediately."""
+        self._boot_time = time.time()
+        for name in self._order:
+            for dep in self._components[name]["deps"]:
+                if dep not in self._components:
+                    raise ValueError(f"Component '{name}' depends on unknown component '{dep}'")
+
+        for name in self._order:
+            threading.Thread(target=self._run, args=(name,), name=f"boot-{name}", daemon=True).start()
+
+    def get(self, name, timeout=None):
+        """Blocks until a component is ready and returns it. Raises if it failed."""
+        comp = self._components[name]
+        if not comp["ready"].wait(timeout):
+            raise TimeoutError(f"Component '{name}' not ready after {timeout}s")
+        if comp["error"] is not None:
+            raise RuntimeError(f"Component '{name}' failed: {comp['error']}")
+        return comp["value"]
+
+    def peek(self, name):
+        """Returns a component if it is already up, otherwise None. Never blocks."""
+        comp = self._components[name]
+        if comp["ready"].is_set() and comp["error"] is None:
+            return comp["value"]
+        return None
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        for name in self._order:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            self._components[name]["ready"].wait(remaining)
+
+    def report(self):
+        """Prints a per-component timing breakdown relative to boot start."""
+        print("[Startup] Boot timing (ms since boot: start -> ready, own time):")
+        rows = sorted(self._order, key=lambda n: self._components[n]["finished"] or float('inf'))
+        for name in rows:
+            comp = self._components[name]
+            if comp["started"] is None:
+                reason = f"skipped ({comp['error']})" if comp["error"] is not None else "not started"
+                print(f"[Startup]   {name:<16} {reason}")
+                continue
+            if comp["finished"] is None:
+                print(f"[Startup]   {name:<16} {self._ms(comp['started']):>7} -> (still starting)")
+                continue
+
+            status = "ok" if comp["error"] is None else f"FAILED ({comp['error']})"
+            print(
+                f"[Startup]   {name:<16} {self._ms(comp['started']):>7} -> {self._ms(comp['finished']):>7}"
+                f"   {round((comp['finished'] - comp['started']) * 1000):>6} ms   {status}"
+            )
+
+    def _ms(self, t):
+        return round((t - self._boot_time) * 1000)
+
+    def _run(self, name):
+        comp = self._components[name]
+        try:
+            args = [self.get(dep) for dep in comp["deps"]]
+            comp["started"] = time.time()
+            comp["value"] = comp["factory"](*args)
+        except Exception as e:
+            comp["error"] = e
+            level = "WARNING" if comp["optional"] else "ERROR"
+            print(f"[Startup] {level}: {name} failed to start: {e}")
+        finally:
+            comp["finished"] = time.time()
+            comp["ready"].set()
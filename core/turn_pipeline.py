@@ -0,0 +1,345 @@
+import asyncio
+import threading
+from utils.segmenter import SentenceSegmenter
+from utils.text_utils import strip_formatting
+from core.llm_clients import Filler
+
+END = object()  # End-of-turn marker flowing through the stage queues
+
+
+class StageQueue(asyncio.Queue):
+    """Bounded asyncio queue that remembers its high-water mark."""
+
+    def __init__(self, name, maxsize):
+        super().__init__(maxsize)
+        self.name = name
+        self.high_water = 0
+
+    def _put(self, item):
+        super()._put(item)
+        self.high_water = max(self.high_water, self.qsize())
+
+
+class TurnPipeline:
+    """
+    Nova's conversation loop as an asyncio pipeline.
+
+    capture (wake word) -> stt -> llm -> segment -> synth -> playback, with UI
+    updates on their own stage. Stages are linked by bounded queues, so a slow
+    stage pushes back on the ones before it, and blocking engines (Porcupine,
+    Whisper, Gemini, ElevenLabs) run in the default thread pool. Every item
+    carries its turn number; a barge-in bumps the turn, drains the queues and
+    anything still in flight for the old turn is dropped on arrival.
+    """
+
+    def __init__(self, ui, wake_engine, listener, bot, tts, audio_out, answer_cache, barge_in,
+                 get_emotion_engine=lambda: None, speculator=None, retry_phrase="I didn't catch that - try saying it again.",
+                 text_queue=32, sentence_queue=4, prefetch=2, ui_queue=64, earcon_tail=0.1):
+        self.ui = ui
+        self.wake_engine = wake_engine
+        self.listener = listener
+        self.bot = bot
+        self.tts = tts
+        self.audio_out = audio_out
+        self.answer_cache = answer_cache
+        self.barge_in = barge_in
+        self.get_emotion_engine = get_emotion_engine
+        self.speculator = speculator  # Optional SpeculativeLLM fed from the STT end-of-speech silence
+        self.retry_phrase = retry_phrase
+        self.earcon_tail = earcon_tail
+        self.sizes = {
+            "utterances": 1,
+            "text": text_queue,
+            "sentences": sentence_queue,
+            "audio": prefetch,
+            "ui": ui_queue,
+        }
+
+        self.turn = 0
+        self.loop = None
+        self.queues = {}
+        self._turn_done = None
+        self._barged = None
+
+    def depths(self):
+        """Current (size, high-water, capacity) of every stage queue."""
+        return {name: (q.qsize(), q.high_water, q.maxsize) for name, q in self.queues.items()}
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.queues = {name: StageQueue(name, size) for name, size in self.sizes.items()}
+        self._turn_done = asyncio.Event()
+        self._barged = asyncio.Event()
+        self.barge_in.on_interrupt = lambda: self.loop.call_soon_threadsafe(self._barged.set)
+
+        await asyncio.gather(
+            self._capture(),
+            self._llm(),
+            self._segment(),
+            self._synth(),
+            self._playback(),
+            self._ui(),
+        )
+
+    # -------------------------------------------------------------------------
+    # STAGES
+    # -------------------------------------------------------------------------
+
+    async def _capture(self):
+        """Wake word + STT. Holds the next turn until this one is spoken or interrupted."""
+        interrupted = False
+        while True:
+            turn = None
+            try:
+                # After a barge-in the wake word was already heard mid-answer
+                if not interrupted:
+                    await self._blocking(self.wake_engine.listen)
+                interrupted = False
+
+                self.turn += 1
+                turn = self.turn
+                await self._emit(self.ui.set_state, 'listening')
+                # Start STT after the beep (plus output latency and room echo) so it never triggers the VAD
+                earcon = self.audio_out.play_earcon('beep') + self.earcon_tail
+
+                on_speculate = self.speculator.speculate if self.speculator else None
+                user_text = await self._blocking(self.listener.listen, self._on_partial, self.wake_engine.detected_at, on_speculate, earcon)
+                print("<<Wake Word Detected>>")
+
+                if not user_text:
+                    print("No speech detected.")
+                    await self._fail_turn(turn)
+                    continue
+
+                print(f'Words Heard: {user_text}')
+                await self._emit(self.ui.set_state, 'processing')
+                await self._emit(self.ui.show_text, user_text, 'user')
+
+                self._turn_done.clear()
+                self._barged.clear()
+                self.barge_in.arm()
+                await self.queues["utterances"].put((turn, user_text))
+
+                done = asyncio.ensure_future(self._turn_done.wait())
+                barged = asyncio.ensure_future(self._barged.wait())
+                await asyncio.wait([done, barged], return_when=asyncio.FIRST_COMPLETED)
+                done.cancel()
+                barged.cancel()
+
+                if await self._blocking(self.barge_in.disarm):
+                    self._cancel_turn()
+                    interrupted = True
+
+                self._report(turn)
+
+            except Exception as e:
+                print(f"Capture Error: {e}")
+                interrupted = False
+                await self._fail_turn(turn)
+                await asyncio.sleep(1.0)  # Don't spin if the wake word engine or microphone keeps failing
+
+    async def _llm(self):
+        """Streams Gemini (or a cached answer) into the text queue."""
+        while True:
+            turn, user_text = await self.queues["utterances"].get()
+            if turn != self.turn:
+                continue
+
+            print("<< Streaming Gemini Response >>")
+            try:
+                engine = self.get_emotion_engine()
+                # May wait briefly for the burst analysis of this utterance, so keep it off the loop
+                emotion_context, mood = await self._blocking(engine.get_context_and_mood) if engine else (None, None)
+
+                cached_answer = self.answer_cache.lookup(user_text, mood)
+                stream = None
+                if cached_answer:
+                    if self.speculator:
+                        self.speculator.cancel()
+                    stream = self.bot.replay(user_text, cached_answer)
+                elif self.speculator:
+                    stream = self.speculator.resolve(user_text)
+                if stream is None:
+                    stream = self.bot.stream_reply(user_text, emotion_context)
+            except Exception as e:
+                print(f"LLM Stage Error: {e}")
+                await self._fail_turn(turn)
+                continue
+
+            await self._emit(self.ui.set_state, 'speaking')
+
+            # The pump thread blocks on the network and on the bounded text queue
+            pump = self._blocking(self._pump, stream, turn)
+            barged = asyncio.ensure_future(self._barged.wait())
+            await asyncio.wait([pump, barged], return_when=asyncio.FIRST_COMPLETED)
+            barged.cancel()
+            if not pump.done():
+                continue  # Interrupted; the pump notices the turn change and exits on its own
+
+            full_log, complete = pump.result()
+            if turn != self.turn:
+                continue
+
+            print(f'\nFull Response: {full_log}')
+            await self.queues["text"].put((turn, END))
+            if complete and not cached_answer:
+                try:
+                    self.answer_cache.store(user_text, full_log, mood)
+                except Exception as e:
+                    print(f"Answer Cache Error: {e}")  # The answer was already spoken; only caching failed
+
+    async def _segment(self):
+        segmenter = SentenceSegmenter()
+        current = None
+        while True:
+            turn, item = await self.queues["text"].get()
+            if turn != self.turn:
+                continue
+            if turn != current:
+                segmenter.reset()
+                current = turn
+
+            try:
+                if item is END:
+                    sentences = [segmenter.flush()]
+                else:
+                    sentences = segmenter.feed(item)
+            except Exception as e:
+                print(f"Segmenter Error: {e}")
+                segmenter.reset()
+                sentences = []
+
+            for sentence in sentences:
+                if len(sentence.strip()) > 2:
+                    await self._emit(self.ui.show_text, sentence, 'nova')
+                    await self.queues["sentences"].put((turn, strip_formatting(sentence)))
+
+            if item is END:
+                await self.queues["sentences"].put((turn, END))
+
+    async def _synth(self):
+        """Starts a download per sentence; the bounded audio queue caps how far ahead it runs."""
+        while True:
+            turn, item = await self.queues["sentences"].get()
+            if turn != self.turn:
+                continue
+            if item is END:
+                await self.queues["audio"].put((turn, END))
+                continue
+
+            chunks = asyncio.Queue()
+            try:
+                threading.Thread(target=self._fetch, args=(item, chunks, turn), daemon=True).start()
+            except Exception as e:
+                print(f"TTS Stage Error: {e}")
+                continue  # Skip the sentence; END still reaches playback and closes the turn
+            await self.queues["audio"].put((turn, chunks))
+
+    async def _playback(self):
+        speech = self.audio_out.speech
+        while True:
+            turn, item = await self.queues["audio"].get()
+            if turn != self.turn:
+                continue
+            if item is END:
+                # Only the end of the turn waits for the mixer to drain
+                await self._blocking(speech.wait)
+                if turn == self.turn:
+                    await self._emit(self.ui.set_state, 'idle')
+                    self._turn_done.set()
+                continue
+
+            try:
+                # Sentences are queued back to back with no wait in between, so playback is gapless
+                while turn == self.turn:
+                    chunk = await item.get()
+                    if chunk is None:
+                        break
+                    speech.write(chunk)
+            except Exception as e:
+                print(f"Playback Error: {e}")  # Drop this sentence; the turn still ends on END
+
+    async def _ui(self):
+        while True:
+            fn, args = await self.queues["ui"].get()
+            try:
+                await self._blocking(fn, *args)
+            except Exception as e:
+                print(f"UI Emit Error: {e}")
+
+    # -------------------------------------------------------------------------
+    # HELPERS
+    # -------------------------------------------------------------------------
+
+    def _blocking(self, fn, *args):
+        return self.loop.run_in_executor(None, fn, *args)
+
+    async def _emit(self, fn, *args):
+        await self.queues["ui"].put((fn, args))
+
+    async def _fail_turn(self, turn):
+        """Ends a turn that produced nothing to answer: say the retry phrase and go back to idle."""
+        if self.speculator:
+            self.speculator.cancel()
+        if turn is None or turn != self.turn:
+            await self._emit(self.ui.set_state, 'idle')
+            return
+        await self._emit(self.ui.show_text, self.retry_phrase, 'nova')
+        await self.queues["sentences"].put((turn, self.retry_phrase))
+        await self.queues["sentences"].put((turn, END))  # Playback sets idle and releases _capture on END
+
+    def _on_partial(self, text):
+        # Called from the STT thread; partials are disposable, so drop them if the UI is backed up
+        def put():
+            if not self.queues["ui"].full():
+                self.queues["ui"].put_nowait((self.ui.show_partial, (text,)))
+        self.loop.call_soon_threadsafe(put)
+
+    def _pump(self, stream, turn):
+        """Thread: iterates the LLM stream into the text queue. Returns (reply so far, completed)."""
+        full_log = ""
+        try:
+            for chunk in stream:
+                if turn != self.turn:
+                    return full_log, False
+                if not isinstance(chunk, Filler):
+                    full_log += chunk  # Fillers are spoken but never cached as part of the answer
+                # Blocks while the text queue is full, so Gemini is read no faster than we can speak
+                asyncio.run_coroutine_threadsafe(self.queues["text"].put((turn, chunk)), self.loop).result()
+        except Exception as e:
+            print(f"LLM Stream Error: {e}")
+            return full_log, False
+        finally:
+            stream.close()
+        return full_log, True
+
+    def _fetch(self, text, chunks, turn):
+        """Thread: downloads one sentence's audio into its chunk queue."""
+        stream = self.tts.stream(text)
+        try:
+            for chunk in stream:
+                if turn != self.turn:
+                    break
+                self.loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        finally:
+            stream.close()
+            self.loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+    def _cancel_turn(self):
+        """Barge-in: invalidate the current turn, drain every stage queue and silence playback."""
+        print("<<Barge-In: Cancelling Turn>>")
+        self.turn += 1
+        if self.speculator:
+            self.speculator.cancel()
+        for name, q in self.queues.items():
+            if name == "ui":
+                continue  # UI updates already queued are still valid history
+            while not q.empty():
+                q.get_nowait()
+        self.tts.stop()
+
+    def _report(self, turn):
+        depths = ", ".join(f"{name}={size}/{high}/{cap}" for name, (size, high, cap) in self.depths().items())
+        print(f"[Pipeline] Turn {turn} queues (now/high/cap): {depths}")
+        for q in self.queues.values():
+            q.high_water = q.qsize()
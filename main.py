@@ -1,17 +1,16 @@
-from core.gemini_api import AIAgent
-from audio.tts_engine import TextToSpeech
-from audio.fwhisp import SpeechListener
-from audio.wakeword_engine import WakeWordListener
 from audio.speaker_correction1 import AudioKeepAlive
-from utils.text_utils import strip_formatting
+from audio.capture_bus import CaptureBus
+from audio.audio_output import AudioOutput
 from ui.ui_server import NovaUI, kioskFunctions
-from core.emotion_engine import EmotionEngine
-from core.prompts import build_prompt
+from core.startup import StartupOrchestrator
+from audio.barge_in import BargeInMonitor
+from core.answer_cache import AnswerCache
+from core.turn_pipeline import TurnPipeline
+from core.speculation import SpeculativeLLM
 import subprocess
+import asyncio
 import time
 import os
-import re
-import queue
 import threading
 from dotenv import load_dotenv
 
@@ -23,128 +22,126 @@ GOOGLE_KEY = os.getenv('GOOGLE_KEY')
 PICOVOICE_KEY = os.getenv('PICOVOICE_KEY')
 emotion_engine = None
 
-tts_queue = queue.Queue()
-def tts_worker(tts_engine):
-    while True:
-        try:
-            text_to_speak = tts_queue.get()
-
-            if text_to_speak is None:
-                break
-            
-            tts_engine.speak(text_to_speak)
-
-            tts_queue.task_done()
-        except Exception as e:
-            print(f'Worker Function Error: {e}')
-            
-def main():
+RETRY_PHRASE = "I didn't catch that - try saying it again."
+# Spoken often enough to be worth synthesizing into the TTS cache at boot
+PREWARM_PHRASES = [RETRY_PHRASE]
+
+# Seconds Gemini gets for its first token (long prompts with memory and emotion context take a few)
+# before Nova says a filler, and between later chunks before the stream is retried
+LLM_TTFT_DEADLINE = float(os.getenv('NOVA_TTFT_DEADLINE', 4.5))
+LLM_CHUNK_DEADLINE = float(os.getenv('NOVA_CHUNK_DEADLINE', 5.0))
+
+# Heavy imports (Porcupine, Faster-Whisper, Gemini, DeepFace/TensorFlow) live inside
+# these factories so they load in parallel on boot threads instead of before the UI is up.
+
+def _start_ui():
     ui = NovaUI()
     ui.wait_until_ready()
-    kioskFunctions.launch_kiosk()
-    amp_guard = AudioKeepAlive()
-    amp_guard.start()
+    return ui
+
+def _start_audio_out():
+    audio_out = AudioOutput()
+    audio_out.load_earcon('beep', 'assets/beep.wav')
+    audio_out.start()
+    return audio_out
 
+def _start_amp_guard(audio_out):
+    amp_guard = AudioKeepAlive(output=audio_out)
+    amp_guard.start()
+    return amp_guard
+
+def _start_mic_bus():
+    mic_bus = CaptureBus()
+    mic_bus.start()
+    return mic_bus
+
+def _start_wake_engine(mic_bus):
+    from audio.wakeword_engine import WakeWordListener
+    return WakeWordListener(PICOVOICE_KEY, bus=mic_bus)
+
+def _start_listener(mic_bus):
+    from audio.fwhisp import SpeechListener
+    return SpeechListener(streaming=True, bus=mic_bus, use_worker_process=True, cpu_threads=2)
+
+def _start_bot():
+    from core.gemini_api import AIAgent
+    client = None
+    if os.getenv('NOVA_LLM') == 'mock':
+        # Offline runs and latency benchmarking without Gemini
+        from core.llm_clients import MockLLMClient
+        client = MockLLMClient()
+    return AIAgent(GOOGLE_KEY, client=client, ttft_deadline=LLM_TTFT_DEADLINE, chunk_deadline=LLM_CHUNK_DEADLINE)
+
+def _start_tts(audio_out):
+    from audio.tts_engine import TextToSpeech
+    from audio.tts_cache import TTSCache
+    from audio.tts_backends import ElevenLabsBackend, LocalTTSBackend, TTSRouter
+
+    remote = ElevenLabsBackend(ELEVEN_KEY, cache=TTSCache())
+    threading.Thread(target=remote.prewarm, args=(PREWARM_PHRASES,), daemon=True).start()
+    try:
+        backend = TTSRouter(remote, LocalTTSBackend(), hedge_after=0.8)
+    except RuntimeError as e:
+        print(f"Local TTS unavailable, ElevenLabs only: {e}")
+        backend = remote
+    return TextToSpeech(backend, audio_out)
+
+def _start_emotion_engine(ui, *_ready):
+    # Depends on the whole voice path so TensorFlow warms up last
     global emotion_engine
-    emotion_engine = EmotionEngine(history_size=10, scan_interval=3)
+    from core.emotion_engine import EmotionEngine
+    emotion_engine = EmotionEngine(history_size=10, scan_interval=3, use_worker_process=True)
+    ui.state_listeners.append(emotion_engine.set_activity)
     emotion_engine.start()
+    return emotion_engine
 
+def main():
+    boot = StartupOrchestrator()
+    boot.add('mic_bus', _start_mic_bus)
+    boot.add('wake_engine', _start_wake_engine, deps=['mic_bus'])
+    boot.add('ui', _start_ui)
+    boot.add('kiosk', lambda ui: kioskFunctions.launch_kiosk(), deps=['ui'], optional=True)
+    boot.add('audio_out', _start_audio_out)
+    boot.add('amp_guard', _start_amp_guard, deps=['audio_out'], optional=True)
+    boot.add('listener', _start_listener, deps=['mic_bus'])
+    boot.add('bot', _start_bot)
+    boot.add('tts', _start_tts, deps=['audio_out'])
+    boot.add('emotion_engine', _start_emotion_engine, deps=['ui', 'wake_engine', 'listener', 'bot', 'tts'], optional=True)
+    boot.start()
 
     try:
-        wake_engine = WakeWordListener(PICOVOICE_KEY)
-        listener = SpeechListener()
-        bot = AIAgent(GOOGLE_KEY)
-        tts = TextToSpeech(ELEVEN_KEY)
-
-        worker_thread = threading.Thread(target=tts_worker, args=(tts,), daemon=True)
-        worker_thread.start()  
+        ui = boot.get('ui')
+        wake_engine = boot.get('wake_engine')
+        listener = boot.get('listener')
+        bot = boot.get('bot')
+        tts = boot.get('tts')
+        audio_out = boot.get('audio_out')
     except Exception as e:
         print(f"Start Up Failed: {e}")
+        boot.report()
         return
+
+    threading.Thread(target=lambda: (boot.wait_all(), boot.report()), daemon=True).start()
+    def emotion_context():
+        # Speculation runs while the student is still talking; never wait for the burst there
+        engine = boot.peek('emotion_engine')
+        return engine.get_context(wait=False) if engine else None
+
+    pipeline = TurnPipeline(
+        ui, wake_engine, listener, bot, tts, audio_out,
+        answer_cache=AnswerCache(),
+        barge_in=BargeInMonitor(wake_engine),
+        get_emotion_engine=lambda: boot.peek('emotion_engine'),
+        speculator=SpeculativeLLM(bot, get_emotion_context=emotion_context),
+        retry_phrase=RETRY_PHRASE,
+        prefetch=2
+    )
+
     ui.set_state('idle')
     time.sleep(2)
     ui.show_text('**Hey Gator!**, I\'m Nova, your personal tutoring assistant. \n\nCall me by saying <\'Hey Nova\'> and asking whatever question you need. \n\n•ᴗ•', sender='nova')   
-    while True:
-        
-        wake_engine.listen()
-        ui.set_state('listening')
-        
-        os.system("aplay assets/beep.wav 2>/dev/null &")
-        
-        user_text = listener.listen()
-        print("<<Wake Word Detected>>")
-
-        if not user_text:
-            print("No speech detected.")
-            ui.show_text("I didn't catch that - try saying it again.", sender='nova')
-            ui.set_state('idle')
-            continue
-            
-        ui.set_state('processing')
-        print(f'Words Heard: {user_text}')
-        ui.show_text(user_text, sender='user')
-
-
-
-        print("<< Streaming Gemini Response >>")
-
-        emotion_context = emotion_engine.get_context()
-        response_stream = bot.chat.send_message(build_prompt(user_text, emotion_context), stream=True)
-
-        buffer = ""
-        full_log = ""
-        
-        ui.set_state('speaking')
-
-        for chunk in response_stream:
-            try:
-                text_chunk = chunk.text
-            except ValueError:
-                continue
-            
-            buffer += text_chunk
-            full_log += text_chunk
-
-         
-            parts = re.split(r'([.!?])', buffer)
-
-            if len(parts) > 1:
-                sentences = []
-                
-            
-                for i in range(0, len(parts) - 1, 2):
-                    if i+1 < len(parts):
-                        sent_text = parts[i]
-                        punct = parts[i+1]
-                        sentences.append(sent_text + punct)
-
-                
-                buffer = parts[-1]
-
-                for sentence in sentences:
-                    if len(sentence.strip()) > 2:
-
-                       
-                        ui.show_text(sentence, sender='nova')
-                        
-                        
-                        clean_sent = strip_formatting(sentence)
-                        tts_queue.put(clean_sent)
-
-        
-        if buffer.strip():
-            ui.show_text(buffer, sender='nova')
-            tts_queue.put(strip_formatting(buffer))
-        
-        print(f'\nFull Response: {full_log}')
-        
-        # REMOVE .JOIN when implelement interruptions.
-        tts_queue.join()
-        
-        ui.set_state('idle')
-                 
-
-                        
+    asyncio.run(pipeline.run())
+
 
 if __name__ == '__main__':
     try:
@@ -153,4 +150,5 @@ if __name__ == '__main__':
         print("\n<<Stopping>>")
         time.sleep(0.5)
         kioskFunctions.close_kiosk()
-        emotion_engine.stop()
+        if emotion_engine:
+            emotion_engine.stop()
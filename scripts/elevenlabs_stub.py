@@ -0,0 +1,91 @@
+"""
+Local stand-in for the ElevenLabs streaming endpoint, for tests and offline benchmarking.
+
+Point ElevenLabsBackend(base_url="http://127.0.0.1:8765") at it. Every request returns
+a short tone as raw 22.05 kHz PCM after a configurable time-to-first-byte, and a
+configurable fraction of requests fail with HTTP 500.
+
+    python scripts/elevenlabs_stub.py --ttfb 0.4 --fail-rate 0.1
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import math
+import random
+import struct
+import threading
+import time
+
+SAMPLE_RATE = 22050
+
+
+def tone_pcm(seconds, hz=220.0, level=0.2):
+    n = int(SAMPLE_RATE * seconds)
+    return b"".join(
+        struct.pack("<h", int(level * 32767 * math.sin(2 * math.pi * hz * i / SAMPLE_RATE)))
+        for i in range(n)
+    )
+
+
+class ElevenLabsStub:
+    """Threaded HTTP stub; use start()/stop() from tests or run this file directly."""
+
+    def __init__(self, host="127.0.0.1", port=8765, ttfb=0.3, fail_rate=0.0, chunk_delay=0.02):
+        self.ttfb = ttfb
+        self.fail_rate = fail_rate
+        self.chunk_delay = chunk_delay
+        self.requests = []
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                payload = json.loads(body or b"{}")
+                stub.requests.append({"path": self.path, "json": payload})
+
+                if random.random() < stub.fail_rate:
+                    self.send_response(500)
+                    self.end_headers()
+                    self.wfile.write(b'{"detail": "stub failure"}')
+                    return
+
+                time.sleep(stub.ttfb)
+                # ~60 ms of audio per character, like a brisk speaking rate
+                audio = tone_pcm(0.06 * len(payload.get("text", "")))
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/pcm")
+                self.send_header("Content-Length", str(len(audio)))
+                self.end_headers()
+                for i in range(0, len(audio), 4096):
+                    self.wfile.write(audio[i:i + 4096])
+                    self.wfile.flush()
+                    time.sleep(stub.chunk_delay)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttfb", type=float, default=0.3, help="Seconds before the first audio byte")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    args = parser.parse_args()
+
+    stub = ElevenLabsStub(port=args.port, ttfb=args.ttfb, fail_rate=args.fail_rate)
+    print(f"ElevenLabs stub listening on {stub.url}")
+    stub.server.serve_forever()
@@ -0,0 +1,42 @@
+"""
+Downloads the kiosk UI's third-party assets into ui/static/vendor, so the page
+never has to reach a CDN at runtime. Run once on a machine with network access
+and commit the results (or copy them to the Pi):
+
+    python scripts/vendor_ui_assets.py [--force]
+
+The fonts are the latin subsets of the weights index.html used to request
+from Google Fonts, as packaged by Fontsource.
+"""
+import os
+import sys
+import urllib.request
+
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ui", "static", "vendor")
+FONTSOURCE = "https://cdn.jsdelivr.net/npm/@fontsource/{package}@{version}/files/{name}"
+
+ASSETS = {
+    "socket.io-4.8.1.min.js": "https://cdn.socket.io/4.8.1/socket.io.min.js",
+}
+for package, version, weights in (("inter", "5.0", (300, 500, 700)), ("jetbrains-mono", "5.0", (400, 700))):
+    for weight in weights:
+        name = f"{package}-latin-{weight}-normal.woff2"
+        ASSETS[f"fonts/{name}"] = FONTSOURCE.format(package=package, version=version, name=name)
+
+
+def main(force=False):
+    for path, url in ASSETS.items():
+        target = os.path.normpath(os.path.join(VENDOR_DIR, path))
+        if os.path.exists(target) and not force:
+            print(f"  have  {path}")
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        with open(target, "wb") as f:
+            f.write(data)
+        print(f"  got   {path} ({len(data) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main(force="--force" in sys.argv)
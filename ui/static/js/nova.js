@@ -0,0 +1,483 @@
+(function() {
+    'use strict';
+
+    var socket = io();
+
+    var container = document.getElementById('conversation-container');
+    var statusDisplay = document.getElementById('status-display');
+    var statusIndicator = document.getElementById('status-indicator');
+    var pulseDot = document.getElementById('pulse-dot');
+    var novaViz = document.getElementById('nova-viz');
+    var coreOrb = document.getElementById('core-orb');
+    var inputGlow = document.getElementById('input-glow');
+    var hintText = document.getElementById('hint-text');
+    var colorWave = document.getElementById('color-wave');
+    var fluidLayer = document.getElementById('fluid-layer');
+    var decoratorShape = document.getElementById('decorator-shape');
+    var scrollToBottomBtn = document.getElementById('scroll-to-bottom');
+    var footer = document.getElementById('footer');
+    var thinkingIndicator = document.getElementById('thinking-indicator');
+
+    var currentState = 'idle';
+    var messageDelay = 0;
+    var isTyping = false;
+    var hasInteracted = false;
+    var slowScrollRAF = null;
+    var partialBubble = null;
+
+    // Event bus position: the server run we're synced with and the last sequence number applied
+    var epoch = null;
+    var lastSeq = 0;
+    var synced = false;
+
+    var statusMessages = {
+        'idle': 'Awaiting Input',
+        'listening': 'Listening...',
+        'processing': 'Processing...',
+        'speaking': 'Speaking...'
+    };
+
+    var stateColors = {
+        'idle': '#3b82f6',
+        'listening': '#f97316',
+        'processing': '#a855f7',
+        'speaking': '#10b981'
+    };
+
+    function triggerFirstInteraction() {
+        if (!hasInteracted) {
+            hasInteracted = true;
+            footer.classList.add('slide-up');
+        }
+    }
+
+    function triggerColorWave(color) {
+        document.documentElement.style.setProperty('--current-state-color', color);
+        colorWave.classList.remove('active');
+        void colorWave.offsetWidth;
+        colorWave.classList.add('active');
+    }
+
+    container.addEventListener('scroll', function() {
+        var isAtBottom = container.scrollHeight - container.scrollTop <= container.clientHeight + 50;
+        if (isAtBottom) {
+            scrollToBottomBtn.classList.remove('visible');
+        } else {
+            scrollToBottomBtn.classList.add('visible');
+        }
+    });
+
+    scrollToBottomBtn.addEventListener('click', function() {
+        container.scrollTo({
+            top: container.scrollHeight,
+            behavior: 'smooth'
+        });
+    });
+
+    function onStatusChange(data) {
+        console.log('Status changed:', data.status);
+        triggerFirstInteraction();
+
+        if (data.status === 'listening' || data.status === 'speaking') {
+            var newColor = stateColors[data.status];
+            triggerColorWave(newColor);
+        }
+
+        currentState = data.status;
+        updateUIState(data.status);
+    }
+
+    function onPartialText(data) {
+        if (!partialBubble) {
+            partialBubble = createBubble(data.sender);
+            partialBubble.classList.add('msg-partial');
+        }
+        partialBubble.querySelector('.msg-content').textContent = data.text;
+        container.scrollTo({
+            top: container.scrollHeight,
+            behavior: 'smooth'
+        });
+    }
+
+    function onUpdateText(data) {
+        console.log('=== NEW MESSAGE RECEIVED ===');
+        console.log('Sender:', data.sender);
+        console.log('Raw text:', data.text);
+
+        // Final transcript replaces the live partial bubble in place
+        if (partialBubble && partialBubble.classList.contains(data.sender === 'nova' ? 'msg-nova' : 'msg-student')) {
+            partialBubble.querySelector('.msg-content').textContent = data.text;
+            partialBubble.classList.remove('msg-partial');
+            partialBubble = null;
+            return;
+        }
+
+        if (data.sender === 'nova') {
+            thinkingIndicator.style.display = 'none';
+        }
+
+        setTimeout(function() {
+            addMessage(data.text, data.sender);
+        }, messageDelay);
+
+        messageDelay += 800;
+
+        setTimeout(function() {
+            messageDelay = 0;
+        }, 3000);
+    }
+
+    var handlers = {
+        'status_change': onStatusChange,
+        'partial_text': onPartialText,
+        'update_text': onUpdateText
+    };
+
+    function applyEvents(events, restore) {
+        events.forEach(function(event) {
+            if (event.seq <= lastSeq) {
+                return;
+            }
+            lastSeq = event.seq;
+            if (restore && event.type === 'update_text') {
+                restoreMessage(event.data.text, event.data.sender);
+            } else {
+                handlers[event.type](event.data);
+            }
+        });
+    }
+
+    // Live frames: one batch of sequenced events per server tick
+    socket.on('events', function(frame) {
+        // Until the replay answer arrives, anything here is also in the replay
+        if (!synced || frame.epoch !== epoch) {
+            return;
+        }
+        applyEvents(frame.events, false);
+    });
+
+    // Answer to our 'replay' request: what we missed, or everything if reset
+    socket.on('replay', function(frame) {
+        if (frame.reset) {
+            container.innerHTML = '';
+            partialBubble = null;
+            lastSeq = 0;
+        }
+        epoch = frame.epoch;
+        // A fresh page or a reset redraws history instantly instead of typing it out
+        applyEvents(frame.events, frame.reset || lastSeq === 0);
+        lastSeq = Math.max(lastSeq, frame.seq);
+        synced = true;
+
+        if (frame.state) {
+            if (frame.state !== 'idle') {
+                triggerFirstInteraction();
+            }
+            currentState = frame.state;
+            updateUIState(frame.state);
+        }
+        container.scrollTop = container.scrollHeight;
+    });
+
+    function updateUIState(state) {
+        statusDisplay.textContent = statusMessages[state] || state.toUpperCase();
+
+        novaViz.classList.remove('idle', 'listening', 'processing', 'speaking');
+        statusIndicator.classList.remove('active');
+        statusDisplay.classList.remove('active');
+        pulseDot.classList.remove('active');
+        inputGlow.classList.remove('active');
+        decoratorShape.classList.remove('listening', 'processing', 'speaking');
+        fluidLayer.classList.remove('listening', 'processing');
+
+        novaViz.classList.add(state);
+
+        var color = stateColors[state] || stateColors.idle;
+        document.documentElement.style.setProperty('--current-state-color', color);
+        pulseDot.style.backgroundColor = color;
+        pulseDot.style.color = color;
+        inputGlow.style.background = 'linear-gradient(90deg, transparent, ' + color + ', transparent)';
+
+        switch(state) {
+            case 'idle':
+                hintText.textContent = 'Say "Hey Nova" to start...';
+                thinkingIndicator.style.display = 'none';
+                break;
+            case 'listening':
+                statusIndicator.classList.add('active');
+                statusDisplay.classList.add('active');
+                pulseDot.classList.add('active');
+                inputGlow.classList.add('active');
+                decoratorShape.classList.add('listening');
+                fluidLayer.classList.add('listening');
+                hintText.textContent = 'Listening to your question...';
+                thinkingIndicator.style.display = 'none';
+                break;
+            case 'processing':
+                decoratorShape.classList.add('processing');
+                fluidLayer.classList.add('processing');
+                hintText.textContent = 'Analyzing your question...';
+                thinkingIndicator.style.display = 'flex';
+                break;
+            case 'speaking':
+                decoratorShape.classList.add('speaking');
+                hintText.textContent = 'Nova is responding...';
+                thinkingIndicator.style.display = 'none';
+                break;
+        }
+    }
+    function startSlowScroll() {
+        // Cancel any in-progress scroll animation before starting a new one
+        if (slowScrollRAF) {
+            cancelAnimationFrame(slowScrollRAF);
+            slowScrollRAF = null;
+        }
+
+        function step() {
+            var target = container.scrollHeight - container.clientHeight;
+            var current = container.scrollTop;
+            var distance = target - current;
+
+            if (distance > 1) {
+                // Move 2.5% of the remaining gap each frame — slow and smooth.
+                // Math.max(1, ...) ensures we always move at least 1px so we
+                // never get stuck inching toward the target forever.
+                container.scrollTop += Math.max(1, distance * 0.05);
+                slowScrollRAF = requestAnimationFrame(step);
+            } else {
+                // Reached the bottom — stop the loop
+                slowScrollRAF = null;
+            }
+        }
+
+        slowScrollRAF = requestAnimationFrame(step);
+    }
+
+
+
+    function parseTextFormatting(text) {
+        var parts = [];
+        var i = 0;
+        var currentText = '';
+
+        while (i < text.length) {
+            var char = text[i];
+            var nextChar = (i + 1 < text.length) ? text[i + 1] : '';
+
+            if (char === '*' && nextChar === '*') {
+
+                if (currentText.length > 0) {
+                    parts.push({type: 'text', content: currentText});
+                    currentText = '';
+                }
+
+                var searchStart = i + 2;
+                var endIndex = -1;
+
+                for (var j = searchStart; j < text.length - 1; j++) {
+                    if (text[j] === '*' && text[j + 1] === '*') {
+                        endIndex = j;
+                        break;
+                    }
+                }
+
+                if (endIndex !== -1) {
+                    var emphContent = text.substring(i + 2, endIndex);
+                    parts.push({type: 'emphasis', content: emphContent});
+                    i = endIndex + 2;
+                    continue;
+                } else {
+                    currentText += char;
+                    i++;
+                }
+            }
+            else if (char === '<') {
+                if (currentText.length > 0) {
+                    parts.push({type: 'text', content: currentText});
+                    currentText = '';
+                }
+
+                var endIndex = text.indexOf('>', i + 1);
+
+                if (endIndex !== -1) {
+                    var italicContent = text.substring(i + 1, endIndex);
+                    parts.push({type: 'italic', content: italicContent});
+                    i = endIndex + 1;
+                    continue;
+                } else {
+                    currentText += char;
+                    i++;
+                }
+            }
+            else {
+                currentText += char;
+                i++;
+            }
+        }
+
+        if (currentText.length > 0) {
+            parts.push({type: 'text', content: currentText});
+        }
+
+        return parts;
+    }
+
+    function createFormattedElement(part) {
+        var elem = document.createElement('span');
+        elem.className = 'text-chunk';
+
+        if (part.type === 'emphasis') {
+            var emphSpan = document.createElement('span');
+            emphSpan.className = 'emphasis';
+            emphSpan.textContent = part.content;
+            elem.appendChild(emphSpan);
+        } else if (part.type === 'italic') {
+            var italicSpan = document.createElement('span');
+            italicSpan.className = 'italic';
+            italicSpan.textContent = part.content;
+            elem.appendChild(italicSpan);
+        } else {
+            elem.textContent = part.content;
+        }
+
+        return elem;
+    }
+
+    function fadeInText(element, text, delay) {
+        return new Promise(function(resolve) {
+            var parts = parseTextFormatting(text);
+            var index = 0;
+            isTyping = true;
+
+            function addNext() {
+                if (index < parts.length) {
+                    var part = parts[index];
+                    var elem = createFormattedElement(part);
+                    element.appendChild(elem);
+
+                    index++;
+                    container.scrollTo({
+
+                });
+                    setTimeout(addNext, delay);
+                } else {
+                    isTyping = false;
+                    resolve();
+                }
+            }
+
+            addNext();
+        });
+    }
+
+    function createBubble(sender) {
+        var messageDiv = document.createElement('div');
+        messageDiv.className = sender === 'nova' ? 'message msg-nova' : 'message msg-student';
+
+        var label = sender === 'nova' ? 'Nova' : 'Student';
+        var labelSpan = document.createElement('span');
+        labelSpan.className = 'msg-label';
+        labelSpan.textContent = label;
+
+        var contentDiv = document.createElement('div');
+        contentDiv.className = 'msg-content';
+
+        messageDiv.appendChild(labelSpan);
+        messageDiv.appendChild(contentDiv);
+        container.appendChild(messageDiv);
+        return messageDiv;
+    }
+
+    function restoreMessage(text, sender) {
+        var lastMsg = container.lastElementChild;
+        var contentDiv;
+        if (sender === 'nova' && lastMsg && lastMsg.classList.contains('msg-nova')) {
+            contentDiv = lastMsg.querySelector('.msg-content');
+            if (!(text.match(/^\s/) || contentDiv.textContent.match(/\s$/))) {
+                text = ' ' + text;
+            }
+        } else {
+            contentDiv = createBubble(sender).querySelector('.msg-content');
+        }
+
+        if (sender === 'nova') {
+            parseTextFormatting(text).forEach(function(part) {
+                contentDiv.appendChild(createFormattedElement(part));
+            });
+        } else {
+            contentDiv.textContent = text;
+        }
+    }
+
+    function addMessage(text, sender) {
+        var lastMsg = container.lastElementChild;
+        var isSameSender = false;
+
+        if (lastMsg) {
+            if (sender === 'nova' && lastMsg.classList.contains('msg-nova')) {
+                isSameSender = true;
+            }
+            // We usually don't append student messages, but you could add that logic here if needed
+        }
+
+        // 2. If it is the same sender (Nova), APPEND to the existing bubble
+        if (isSameSender && sender === 'nova') {
+            var contentDiv = lastMsg.querySelector('.msg-content');
+
+            // Add a leading space if the new text doesn't have one, to prevent "Hello.How are you"
+            var prefix = (text.match(/^\s/) || contentDiv.textContent.match(/\s$/)) ? "" : " ";
+
+            // Use your existing animation function on the NEW text only
+            fadeInText(contentDiv, prefix + text, 150);
+            startSlowScroll();
+
+        }
+        // 3. Otherwise, create a NEW bubble (This is your original code)
+        else {
+            var contentDiv = createBubble(sender).querySelector('.msg-content');
+
+            // Scroll down
+            setTimeout(function() {
+                container.scrollTo({
+                    top: container.scrollHeight,
+                    behavior: 'smooth'
+                });
+            }, 100);
+
+            if (sender === 'nova') {
+
+                fadeInText(contentDiv, text, 100);
+                setTimeout(function() {
+                    startSlowScroll();
+                }, 150);
+            } else {
+                // 3. STUDENT: Show text instantly
+                contentDiv.textContent = text;
+
+                // Scroll to bottom ensuring the student's text is visible
+                setTimeout(function() {
+                    container.scrollTo({
+                        top: container.scrollHeight,
+                        behavior: 'smooth'
+                    });
+                }, 100);
+            }
+        }
+    }
+
+    socket.on('connect', function() {
+        console.log('Connected to Nova server');
+        synced = false;
+        socket.emit('replay', {last_seq: lastSeq, epoch: epoch});
+    });
+
+    socket.on('disconnect', function() {
+        console.log('Disconnected from Nova server');
+        synced = false;
+        statusDisplay.textContent = 'Connection Lost';
+        hintText.textContent = 'Reconnecting...';
+    });
+
+    console.log('Nova UI initialized');
+    updateUIState('idle');
+})();
@@ -0,0 +1,156 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from flask import Response
+
+COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}  # woff2 and images are compressed already
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+CSS_URL = re.compile(r"url\((['\"]?)([^'\")]+)\1\)")
+
+
+class StaticAssets:
+    """
+    The kiosk page's bundled files, served without any network dependency.
+
+    Everything under `root` is read once at startup. Each file is published
+    under a versioned name carrying a hash of its content (nova.css ->
+    nova.1a2b3c4d5e6f.css), which is served with a strong ETag and a year-long
+    immutable cache lifetime; url() references inside CSS are rewritten to
+    versioned names too. Text assets are precompressed with gzip, and with
+    brotli when the `brotli` module is installed, and the smallest encoding the
+    browser accepts is sent. Compressed variants are kept in `cache_dir`, so a
+    Pi restart doesn't redo the brotli work.
+    """
+
+    def __init__(self, root, cache_dir="cache/ui_assets"):
+        self.root = root
+        self.cache_dir = cache_dir
+        self.assets = {}     # Relative path -> asset dict
+        self.versioned = {}  # Versioned path -> asset dict
+
+        try:
+            import brotli
+            self._brotli = brotli
+        except ImportError:
+            self._brotli = None
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        paths = []
+        for directory, _, files in os.walk(root):
+            for name in files:
+                paths.append(os.path.relpath(os.path.join(directory, name), root).replace(os.sep, "/"))
+        # CSS last, so the files it references already have their versioned names
+        for path in sorted(paths, key=lambda p: (p.endswith(".css"), p)):
+            with open(os.path.join(root, path), "rb") as f:
+                data = f.read()
+            if path.endswith(".css"):
+                data = self._rewrite_css(path, data)
+            self._add(path, data)
+
+        total = sum(len(a["body"][None]) for a in self.assets.values())
+        sent = sum(min(len(b) for b in a["body"].values()) for a in self.assets.values())
+        print(f"[UI] {len(self.assets)} static assets, {total // 1024} KB ({sent // 1024} KB compressed)")
+
+    def has(self, path):
+        return path in self.assets
+
+    def url(self, path):
+        """Versioned URL for a bundled file, for templates."""
+        asset = self.assets.get(path)
+        if asset is None:
+            print(f"[UI] WARNING: missing static asset {path}")
+            return "/static/" + path
+        return "/static/" + asset["versioned"]
+
+    def response(self, path, request):
+        """Serves a versioned path (cached for a year) or a plain one (revalidated every time)."""
+        asset = self.versioned.get(path)
+        cache_control = IMMUTABLE
+        if asset is None:
+            asset = self.assets.get(path)
+            cache_control = REVALIDATE
+        if asset is None:
+            return Response("Not found", status=404, mimetype="text/plain")
+        return self.send(asset, request, cache_control)
+
+    def page(self, body, mimetype="text/html"):
+        """Wraps a rendered page as an asset, so it gets the same compression and ETag handling."""
+        return self._prepare(body.encode("utf-8") if isinstance(body, str) else body, mimetype, ".html")
+
+    def send(self, asset, request, cache_control=REVALIDATE):
+        headers = {
+            "ETag": f'"{asset["etag"]}"',
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if asset["etag"] in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        encoding = None
+        for candidate in ("br", "gzip"):
+            if candidate in asset["body"] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        # The ETag names the content, not the encoding, so the same tag is valid for every variant
+        return Response(asset["body"][encoding], mimetype=asset["mimetype"], headers=headers)
+
+    def _add(self, path, data):
+        stem, ext = posixpath.splitext(path)
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        asset = self._prepare(data, mimetype, ext)
+        asset["versioned"] = f"{stem}.{asset['etag'][:12]}{ext}"
+        self.assets[path] = asset
+        self.versioned[asset["versioned"]] = asset
+
+    def _prepare(self, data, mimetype, ext):
+        digest = hashlib.sha256(data).hexdigest()
+        body = {None: data}
+        if ext in COMPRESSIBLE:
+            gz = self._cached(digest, "gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))
+            if len(gz) < len(data):
+                body["gzip"] = gz
+            if self._brotli:
+                br = self._cached(digest, "br", lambda: self._brotli.compress(data, quality=11))
+                if len(br) < len(data):
+                    body["br"] = br
+        return {"etag": digest[:32], "mimetype": mimetype, "body": body}
+
+    def _cached(self, digest, suffix, compress):
+        if not self.cache_dir:
+            return compress()
+        path = os.path.join(self.cache_dir, f"{digest}.{suffix}")
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+        data = compress()
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"[UI] Could not cache compressed asset: {e}")
+        return data
+
+    def _rewrite_css(self, path, data):
+        base = posixpath.dirname(path)
+
+        def versioned(match):
+            quote, ref = match.groups()
+            target = posixpath.normpath(posixpath.join(base, ref))
+            asset = self.assets.get(target)
+            if asset is None or ref.startswith(("data:", "/", "http:", "https:")):
+                return match.group(0)
+            new_ref = posixpath.relpath(asset["versioned"], base or ".")
+            return f"url({quote}{new_ref}{quote})"
+
+        return CSS_URL.sub(versioned, data.decode("utf-8")).encode("utf-8")
@@ -1,27 +1,191 @@
 import threading
-from flask import Flask, render_template
+from collections import deque
+from flask import Flask, render_template, request
 from flask_socketio import SocketIO
 import socket
 import logging
 import os
 import subprocess
 import time
+from ui.static_assets import StaticAssets
 
 
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
-app = Flask(__name__)
+app = Flask(__name__, static_folder=None)
 app.config['SECRET_KEY'] = 'nova_cise_lab_2024'
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
+app.jinja_env.trim_blocks = True
+app.jinja_env.lstrip_blocks = True
+
+# Google Fonts' latin subsets, fetched once with scripts/vendor_ui_assets.py; system fonts stand in until then
+FONTS = [
+    ('Inter', 300, 'vendor/fonts/inter-latin-300-normal.woff2'),
+    ('Inter', 500, 'vendor/fonts/inter-latin-500-normal.woff2'),
+    ('Inter', 700, 'vendor/fonts/inter-latin-700-normal.woff2'),
+    ('JetBrains Mono', 400, 'vendor/fonts/jetbrains-mono-latin-400-normal.woff2'),
+    ('JetBrains Mono', 700, 'vendor/fonts/jetbrains-mono-latin-700-normal.woff2'),
+]
+_assets = None
+_assets_lock = threading.Lock()
+_index_page = None
+
+def _get_assets():
+    """
+    Everything the page needs is bundled here, so the kiosk looks the same with or without network.
+    Built by NovaUI (or the first request) rather than at import, so spawned worker processes
+    that import this module never hash and compress the static tree.
+    """
+    global _assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = StaticAssets(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+            app.jinja_env.globals['asset_url'] = _assets.url
+    return _assets
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    # The page has no per-request content, so it is rendered and compressed once
+    global _index_page
+    assets = _get_assets()
+    if _index_page is None:
+        fonts = [{'family': f, 'weight': w, 'path': p} for f, w, p in FONTS if assets.has(p)]
+        _index_page = assets.page(render_template('index.html', fonts=fonts))
+    return assets.send(_index_page, request)
+
+@app.route('/static/<path:filename>')
+def static_asset(filename):
+    return _get_assets().response(filename, request)
+
+
+class UIEventBus:
+    """
+    Orders, batches and remembers everything sent to the kiosk page.
+
+    Every event gets a sequence number when it is published, from whichever
+    thread. A ticker thread flushes pending events as one 'events' frame every
+    `tick` seconds, coalescing on the way: consecutive state changes collapse
+    to the last one, a newer partial transcript replaces an older one from the
+    same sender, and Nova's consecutive sentences merge into one text event.
+    Flushed text lands in a bounded transcript log, so a page that reconnects
+    asks for 'replay' with the last sequence number it saw and gets only what
+    it missed (or the whole log, if it fell too far behind or the server was
+    restarted in between).
+    """
+
+    def __init__(self, socketio, tick=0.05, log_size=300):
+        self.socketio = socketio
+        self.tick = tick
+        self.epoch = int(time.time() * 1000)  # Identifies this server run; sequence numbers restart with it
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._flushed = 0  # Seq up to which every event has been sent (or coalesced away)
+        self._pending = []
+        self._wake = threading.Event()
+
+        self.log = deque(maxlen=log_size)  # Flushed update_text events
+        self._trimmed = 0                   # Seq of the newest event pushed out of the log
+        self._state = None                  # Last flushed status_change event
+        self._partials = {}                 # sender -> last flushed partial_text not yet finalized
+        self._thread = None
+
+    def start(self):
+        """Starts the ticker thread; events published before this wait for the first tick."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._ticker, name="nova-ui-bus", daemon=True)
+            self._thread.start()
+
+    def publish(self, kind, data):
+        with self._lock:
+            self._seq += 1
+            event = {'seq': self._seq, 'type': kind, 'data': data}
+            pending = self._pending
+            last = pending[-1] if pending else None
+
+            if kind == 'status_change' and last and last['type'] == kind:
+                pending[-1] = event
+            elif kind == 'partial_text':
+                pending[:] = [e for e in pending if not (e['type'] == kind and e['data']['sender'] == data['sender'])]
+                pending.append(event)
+            elif kind == 'update_text':
+                # The final text supersedes the sender's partials still waiting to go out
+                pending[:] = [e for e in pending if not (e['type'] == 'partial_text' and e['data']['sender'] == data['sender'])]
+                last = pending[-1] if pending else None
+                if data['sender'] == 'nova' and last and last['type'] == kind and last['data']['sender'] == 'nova':
+                    event['data'] = {'text': _join(last['data']['text'], data['text']), 'sender': 'nova'}
+                    pending[-1] = event
+                else:
+                    pending.append(event)
+            else:
+                pending.append(event)
+        self._wake.set()
+
+    def replay(self, sid, last_seq=0, epoch=None):
+        """Sends one client what it missed since `last_seq`, or the whole log with reset=True."""
+        with self._lock:
+            reset = epoch != self.epoch or last_seq > self._seq or last_seq < self._trimmed
+            if reset:
+                last_seq = 0
+            events = [e for e in self.log if e['seq'] > last_seq]
+            events += [e for e in self._partials.values() if e['seq'] > last_seq]
+            events.sort(key=lambda e: e['seq'])
+            self.socketio.emit('replay', {
+                'epoch': self.epoch,
+                'reset': reset,
+                'seq': self._flushed,
+                'state': self._state['data']['status'] if self._state else None,
+                'events': events,
+            }, to=sid)
+
+    def _ticker(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.tick)  # Let the rest of the burst arrive
+            self._wake.clear()
+            try:
+                self._flush()
+            except Exception as e:
+                # This is the only flush thread; if it died the kiosk would freeze
+                print(f"[UI] Event flush error: {e}")
+
+    def _flush(self):
+        with self._lock:
+            events, self._pending = self._pending, []
+            if not events:
+                return
+            self._flushed = self._seq
+            for event in events:
+                kind, data = event['type'], event['data']
+                if kind == 'update_text':
+                    if len(self.log) == self.log.maxlen:
+                        self._trimmed = self.log[0]['seq']
+                    self.log.append(event)
+                    self._partials.pop(data['sender'], None)
+                elif kind == 'partial_text':
+                    self._partials[data['sender']] = event
+                elif kind == 'status_change':
+                    self._state = event
+            # Emitting under the lock keeps frames and replays in sequence order
+            self.socketio.emit('events', {'epoch': self.epoch, 'events': events})
+
+
+def _join(a, b):
+    return a + b if a.endswith((' ', '\n')) or b.startswith((' ', '\n')) else a + ' ' + b
+
+
+bus = UIEventBus(socketio)
+
 
 class NovaUI:
 
     def __init__(self):
+        self.bus = bus
+        self.bus.start()
+        _get_assets()  # Pay for hashing and compression at boot, not on the kiosk's first page load
+        self.state_listeners = []  # Called with every new state, e.g. EmotionEngine.set_activity
         self.server_thread = threading.Thread(target=self._run_server, daemon=True)
         self.server_thread.start()
         print("Nova UI server starting on http://0.0.0.0:5000") 
@@ -46,11 +210,20 @@ class NovaUI:
     def set_state(self, state):
 
         print(f">> UI State: {state}")
-        socketio.emit('status_change', {'status': state})
+        self.bus.publish('status_change', {'status': state})
+        for listener in self.state_listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                print(f"[UI] State listener error: {e}")
 
     def show_text(self, text, sender):
 
-        socketio.emit('update_text', {'text': text, 'sender': sender})
+        self.bus.publish('update_text', {'text': text, 'sender': sender})
+
+    def show_partial(self, text, sender='user'):
+        # Live transcript while the student is still talking; replaced by the next show_text for that sender.
+        self.bus.publish('partial_text', {'text': text, 'sender': sender})
 
 class kioskFunctions():
 
@@ -90,3 +263,8 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     print(">> UI Client disconnected")
+
+@socketio.on('replay')
+def handle_replay(data):
+    data = data or {}
+    bus.replay(request.sid, int(data.get('last_seq') or 0), data.get('epoch'))
@@ -0,0 +1,173 @@
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "vs", "approx", "fig",
+    "e.g", "i.e", "eg", "ie", "cf", "vol", "ch", "dept", "u.s",
+}
+
+# Also ordinary sentence-final words ("No.", "wait a sec."), so only abbreviations before
+# a number ("No. 5", "sec. 3") or a name ("St. Louis"); "al." only in "et al."
+NUMBER_ABBREVIATIONS = {"no", "sec"}
+NAME_ABBREVIATIONS = {"st"}
+
+TERMINATORS = ".!?"
+CLOSERS = "\"')]"
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitter for streamed LLM text.
+
+    feed() only scans the characters it hasn't seen before, so a whole response costs
+    linear time no matter how it is chunked. It won't split on decimals ("3.14"),
+    common abbreviations, initials, or inside Nova's **bold** and <analogy> markup.
+    Short sentences are coalesced until they reach a character budget, so every TTS
+    request is worth its round-trip; the first one uses a smaller budget to keep
+    time-to-first-audio low.
+    """
+
+    def __init__(self, min_chars=60, first_min_chars=20, max_markup_chars=200):
+        self.min_chars = min_chars
+        self.first_min_chars = first_min_chars
+        self.max_markup_chars = max_markup_chars
+        self.reset()
+
+    def reset(self):
+        self._buf = ""
+        self._pos = 0         # Next unscanned index in _buf
+        self._start = 0       # Start of the current sentence in _buf
+        self._in_bold = False
+        self._in_angle = False
+        self._markup_start = 0
+        self._pending = ""    # Complete sentences waiting to reach the budget
+        self._emitted = 0
+
+    def feed(self, chunk):
+        """Adds streamed text and returns the list of coalesced sentences now ready."""
+        self._buf += chunk
+        ready = []
+
+        for end in self._scan():
+            self._pending += self._buf[self._start:end]
+            self._start = end
+            budget = self.first_min_chars if self._emitted == 0 else self.min_chars
+            if len(self._pending.strip()) >= budget:
+                ready.append(self._take_pending())
+
+        # Drop consumed text so the buffer only ever holds the open sentence
+        if self._start:
+            self._buf = self._buf[self._start:]
+            self._pos -= self._start
+            self._markup_start -= self._start
+            self._start = 0
+
+        return ready
+
+    def flush(self):
+        """Returns whatever is left at the end of the stream (may be empty)."""
+        self._pending += self._buf[self._start:]
+        rest = self._take_pending() if self._pending.strip() else ""
+        self.reset()
+        return rest
+
+    def _take_pending(self):
+        text = self._pending
+        self._pending = ""
+        self._emitted += 1
+        return text
+
+    def _scan(self):
+        """Yields sentence end offsets in _buf, advancing _pos past everything decided."""
+        buf = self._buf
+        n = len(buf)
+        i = self._pos
+
+        while i < n:
+            c = buf[i]
+
+            if c == "*":
+                if i + 1 >= n:
+                    break  # Can't tell "*" from "**" yet
+                if buf[i + 1] == "*":
+                    self._in_bold = not self._in_bold
+                    self._markup_start = i
+                    i += 2
+                    continue
+
+            elif c == "<" and not self._in_angle:
+                if i + 1 >= n:
+                    break
+                if not buf[i + 1].isspace():  # "x < 5" is a comparison, not markup
+                    self._in_angle = True
+                    self._markup_start = i
+
+            elif c == ">" and self._in_angle:
+                self._in_angle = False
+
+            elif c == "\n" and not (self._in_bold or self._in_angle):
+                if i + 1 >= n:
+                    break
+                if buf[i + 1] == "\n":
+                    i += 2
+                    yield i
+                    continue
+
+            elif c in TERMINATORS and not (self._in_bold or self._in_angle):
+                end = self._sentence_end(buf, i)
+                if end is None:
+                    break  # Need more text to decide
+                if end > 0:
+                    i = end
+                    yield end
+                    continue
+
+            # Unclosed markup: stop protecting it after a while so we don't stall forever
+            if (self._in_bold or self._in_angle) and i - self._markup_start > self.max_markup_chars:
+                self._in_bold = self._in_angle = False
+
+            i += 1
+
+        self._pos = i
+
+    def _sentence_end(self, buf, i):
+        """
+        For a terminator at i returns the end offset of the sentence, 0 if it isn't a
+        boundary, or None if the following characters haven't arrived yet.
+        """
+        n = len(buf)
+        c = buf[i]
+
+        if c == ".":
+            if i + 1 >= n:
+                return None
+            # Decimal point or version number
+            if i > 0 and buf[i - 1].isdigit() and buf[i + 1].isdigit():
+                return 0
+            word = self._word_before(buf, i)
+            lower = word.lower()
+            if lower in ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+                return 0
+            if lower == "al" and buf[max(0, i - 5):i].lower() == "et al":
+                return 0
+            if lower in NUMBER_ABBREVIATIONS or lower in NAME_ABBREVIATIONS:
+                k = i + 1
+                while k < n and buf[k] == " ":
+                    k += 1
+                if k >= n:
+                    return None
+                if (lower in NUMBER_ABBREVIATIONS and buf[k].isdigit()) or (lower in NAME_ABBREVIATIONS and buf[k].isupper()):
+                    return 0
+
+        # Swallow runs like "?!" or "..." and closing quotes/brackets
+        j = i + 1
+        while j < n and (buf[j] in TERMINATORS or buf[j] in CLOSERS):
+            j += 1
+        if j >= n:
+            return None
+        if not buf[j].isspace():
+            return 0
+        return j
+
+    def _word_before(self, buf, i):
+        j = i
+        while j > 0 and (buf[j - 1].isalpha() or buf[j - 1] == "."):
+            j -= 1
+        return buf[j:i]
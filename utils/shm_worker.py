@@ -0,0 +1,105 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import threading
+import queue
+import time
+
+
+class SharedMemoryWorker:
+    """
+    A supervised child process that shares one block of memory with its parent.
+
+    `target(shm_name, *args, requests, results)` runs in a spawned process: it
+    attaches to the shared memory, puts ("ready", None) on `results` once it is
+    warm, then answers each (job_id, ...) tuple from `requests` with
+    (job_id, result or exception) until it receives None. call() runs one job at
+    a time; a worker that dies or misses the `timeout` deadline is killed and
+    restarted, and the call raises.
+    """
+
+    def __init__(self, label, target, args, shm_size, timeout=10.0):
+        self.label = label
+        self.target = target
+        self.args = tuple(args)
+        self.timeout = timeout
+        self.restarts = 0
+
+        self._ctx = mp.get_context("spawn")
+        self.shm = shared_memory.SharedMemory(create=True, size=shm_size)
+        self._lock = threading.Lock()
+        self._job_id = 0
+        self._process = None
+        try:
+            self._start_process()
+        except Exception:
+            self.shm.close()
+            self.shm.unlink()
+            raise
+
+    def _start_process(self):
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=self.target,
+            args=(self.shm.name,) + self.args + (self._requests, self._results),
+            name=f"nova-{self.label.lower()}",
+            daemon=True
+        )
+        self._process.start()
+
+        # Model loads take a while on a Pi; wait for them so jobs never queue behind one
+        while True:
+            try:
+                tag, _ = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError(f"{self.label} exited while starting up")
+                continue
+            if tag == "ready":
+                break
+        print(f"[{self.label}] Ready (pid {self._process.pid})")
+
+    def _restart(self, reason):
+        print(f"[{self.label}] {reason}, restarting...")
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join(timeout=5)
+        self.restarts += 1
+        self._start_process()
+
+    def call(self, *job):
+        """Sends (job_id, *job) to the worker and returns its result, raising if it failed or timed out."""
+        with self._lock:
+            if not self._process.is_alive():
+                self._restart("Worker died")
+
+            self._job_id += 1
+            job_id = self._job_id
+            self._requests.put((job_id,) + job)
+
+            deadline = time.time() + self.timeout
+            while True:
+                try:
+                    result_id, result = self._results.get(timeout=0.5)
+                except queue.Empty:
+                    if not self._process.is_alive():
+                        self._restart("Worker died during a job")
+                        raise RuntimeError(f"{self.label} crashed")
+                    if time.time() > deadline:
+                        self._restart(f"No result after {self.timeout:.0f}s")
+                        raise RuntimeError(f"{self.label} timed out")
+                    continue
+                if result_id == job_id:
+                    break
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stop(self):
+        """Asks the worker to exit and releases the shared memory. Views into `shm` must be dropped first."""
+        if self._process and self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(timeout=5)
+        self.shm.close()
+        self.shm.unlink()